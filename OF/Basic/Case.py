@@ -15,44 +15,95 @@
 #Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
 
 
+import os
+import shutil
+import subprocess
+from copy import copy
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
 from os import listdir
-from os.path import join,split
+from os.path import abspath,basename,isdir,islink,join,relpath,split
 from re import compile,findall
 
 from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
-from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
 
 from OF import Settings
 from OF.PostProcessing import DataFile    
 from OF.NavalHydro import Resistance
-from OF.Basic import Utilities, FlowProperties, Turbulence
+from OF.Basic import Utilities, FlowProperties, Turbulence, FieldFile
+
+forcesDirectories = ("forces", "forcesFS", "resistance")
+"""
+Names of the function objects, whose output directory in a case holds the
+forces, see :func:`forcesPaths`.
+
+:type: tuple
+"""
+
+class lazyAttribute(object):
+    """
+    Attribute of a :class:`case`, that is expensive to compute. On first
+    access, the method ``loader`` of the instance is called, which has to
+    assign the attribute. While the loader is running, the attribute holds a
+    copy of the default value. Assigning the attribute directly skips the
+    loader.
+
+    :param name: Name of the attribute
+    :type name: string
+    :param loader: Name of the method, that assigns the attribute
+    :type loader: string
+    :param default: Value of the attribute, while the loader is running
+    """
+
+    def __init__(self, name, loader, default=None):
+        self.name = name
+        self.loader = loader
+        self.default = default
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            instance.__dict__[self.name] = copy(self.default)
+            try:
+                getattr(instance, self.loader)()
+            except:
+                del instance.__dict__[self.name]
+                raise
+            return instance.__dict__[self.name]
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
 
 class case(SolutionDirectory):
     """
     Inherits all function from
-    :class:`PyFoam.RunDictionary.SolutionDirectory` and reads some
-    properties from the case on initialisation.
+    :class:`PyFoam.RunDictionary.SolutionDirectory`. The properties of the
+    case, that require to read files, are read on first access, so that
+    opening a case is cheap.
 
     :Author: Jens Hoepken <jhoepken@gmail.com>
     """
 
-    Re = 0.0
+    Re = lazyAttribute('Re', 'updateInletVelocity', 0.0)
     """
     Stores the Reynoldsnumber
 
     :type: float
     """
 
-    Fr = 0.0
+    Fr = lazyAttribute('Fr', 'updateInletVelocity', 0.0)
     """
     Stores the Froudenumber
 
     :type: float
     """
 
-    uInf = 0.0
+    uInf = lazyAttribute('uInf', 'updateInletVelocity', 0.0)
 
-    turbulenceModel = None
+    turbulenceModel = lazyAttribute('turbulenceModel', 'readTurbulenceModel')
     """
     Stores the name of the employed turbulence model
 
@@ -67,14 +118,14 @@ class case(SolutionDirectory):
     :type: []
     """
 
-    inletVelocity = 0.0
+    inletVelocity = lazyAttribute('inletVelocity', 'updateInletVelocity', 0.0)
     """
     Stores the inlet velocity as a vector
 
     :type: tuple
     """
 
-    forces = None
+    forces = lazyAttribute('forces', 'loadForces')
     """
     Stores the relative path to the forces.dat
 
@@ -89,7 +140,11 @@ class case(SolutionDirectory):
     :type: string
     """
 
-    resistances = {'CF':None,'CT':None,'RF':None,'RT':None}
+    resistances = lazyAttribute(
+                            'resistances',
+                            'loadCoeffs',
+                            {'CF':None,'CT':None,'RF':None,'RT':None}
+                            )
     """
     Stores the forces and coefficients in the common naval architecture
     notation, as a dict. The type is the key. 
@@ -98,7 +153,7 @@ class case(SolutionDirectory):
     :type: numpy array
     """
 
-    t = None
+    t = lazyAttribute('t', 'loadCoeffs')
     """
     Stores the time line for each timestep
 
@@ -127,13 +182,6 @@ class case(SolutionDirectory):
                                     parallel=parallel,
                                     region=region
                                     )
-        self.resistances = {'CF':None,'CT':None,'RF':None,'RT':None}
-
-        # Get the used turbulence model
-        self.turbulenceModel = self.getDictionaryContents(
-                                                self.constantDir(),
-                                                'RASProperties'
-                                            )['RASModel']
 
         ###############################
         # Process optional parameters #
@@ -141,17 +189,6 @@ class case(SolutionDirectory):
         if 'inletPatch' in kwargs.iterkeys():
             self.inletPatch = [kwargs['inletPatch']]
         else:
-            # Detect the inlet patches automatically.
-            uBC = ParsedParameterFile(join(self.name,self.first, "U"))
-            for patchI in uBC["boundaryField"]:
-                typeI = uBC['boundaryField'][patchI]['type']
-                try:
-                    valueI = uBC['boundaryField'][patchI]['value'].value()
-                except KeyError:
-                    valueI = None
-                if typeI in Settings.inletPatchTypes and valueI > 0.0:
-                    self.inletPatch.append(patchI)
-
             self.inletPatch = [Settings.inletPatch]
 
         if 'L' in kwargs.iterkeys():
@@ -169,31 +206,50 @@ class case(SolutionDirectory):
         else:
             self.direction = -1
 
-        self.updateInletVelocity()
-        self.forces = self.createDataFile()
-
-        try:
-            self.calculateCoeffs()
-        except TypeError:
-            pass
-        except ValueError:
-            pass
-
         self.getShortCasePath()
         self.shortCaseName = split(self.name)[1]
 
-    def writeTurbulence(self, dh, u=None):
+    def writeTurbulence(self, dh, u=None, templates=None):
         l = 0.07*dh
         if not u:
             t = Turbulence.initFieldFoam(self, self.uInf, l)
         else:
             t = Turbulence.initFieldFoam(self, u, l)
-        t.write()
+        t.write(templates=templates)
+
+    def readTurbulenceModel(self):
+        """
+        Reads the name of the turbulence model from ``RASProperties``.
+        """
+        self.turbulenceModel = self.getDictionaryContents(
+                                                self.constantDir(),
+                                                'RASProperties'
+                                            )['RASModel']
+
+    def loadForces(self):
+        """
+        Reads the forces via :meth:`createDataFile`.
+        """
+        self.forces = self.createDataFile()
+
+    def loadCoeffs(self):
+        """
+        Calculates the coefficients via :meth:`calculateCoeffs`, but ignores
+        missing forces. Both :attr:`t` and :attr:`resistances` are assigned,
+        so that the forces are read only once, regardless of which attribute
+        is accessed first.
+        """
+        try:
+            self.calculateCoeffs()
+        except (TypeError, ValueError):
+            self.t = None
+            self.resistances = {'CF':None,'CT':None,'RF':None,'RT':None}
 
     def calculateCoeffs(self):
         """
         If forces exist, the respective coefficients are calculated accordingly.
-        Otherwise a ValueError is raised.
+        Otherwise a ValueError is raised, which names the case and the
+        directories, that have been searched for the forces.
 
         :param L: Reference length
         :type L: float
@@ -205,16 +261,46 @@ class case(SolutionDirectory):
         self.Fr = FlowProperties.Fr(L=self.L,u=self.uInf)
 
         if self.forces:
-            self.t = self.forces[0]
-            self.resistances['RF'] = self.direction*self.forces[abs(self.direction)+3]
-            self.resistances['RT'] = self.resistances['RF'] +\
-                                    self.direction*self.forces[abs(self.direction)]
-            self.resistances['CF'] = Resistance.forceCoeff(self.resistances['RF'],
+            # Only use the rows, that form a monotonic time line
+            rows = self.forces.rows()
+            resistances = {}
+            resistances['RF'] = self.direction*\
+                                self.forces[abs(self.direction)+3][rows]
+            resistances['RT'] = resistances['RF'] +\
+                                self.direction*self.forces[abs(self.direction)][rows]
+            resistances['CF'] = Resistance.forceCoeff(resistances['RF'],
                                                         self.A,u=self.uInf)
-            self.resistances['CT'] = Resistance.forceCoeff(self.resistances['RT'],
+            resistances['CT'] = Resistance.forceCoeff(resistances['RT'],
                                                         self.A,u=self.uInf)
+
+            # Both attributes are assigned at the end, as reading one of them
+            # before would run this method again through its loader
+            self.t = self.forces[0][rows]
+            self.resistances = resistances
         else:
-            raise ValueError
+            raise ValueError(
+                    "No forces found for the case %s in %s" %(
+                        self.name,
+                        " or ".join(join(self.name,dI) for dI in forcesDirectories)
+                        )
+                    )
+
+    def window(self, start=0.0, end=1.0, absolute=False):
+        """
+        Returns a slice, that selects a time window from :attr:`t` and the
+        :attr:`resistances`.
+
+        :param start: Start of the window
+        :type start: float
+        :param end: End of the window
+        :type end: float
+        :param absolute: States whether start and end are absolute times or
+            relative to the last time.
+        :type absolute: bool
+
+        :rtype: slice
+        """
+        return DataFile.window(self.t, start, end, absolute)
 
     def getShortCasePath(self):
         out = []
@@ -231,18 +317,30 @@ class case(SolutionDirectory):
         """
         Reads and updates the inlet velocity. This has to be done without
         pyFoam, as this takes *ages* for a file with precalculated
-        velocities.
+        velocities. Instead, the boundaryField of the velocity file is
+        scanned until the value of an inlet patch is found, skipping
+        nonuniform lists without parsing them.
         """
-        inletFound = False
-        with open(join(self.name,self.first,'U'),'r') as bc:
-            for line in bc:
-                for patchI in self.inletPatch:
-                    if patchI in line:
-                        inletFound = True
-                    if inletFound:
-                        if "uniform" in line:
-                            vIn = line
-                            break
+        keywords = ('value','inletValue')
+        entries = FieldFile.patchEntries(
+                                    join(self.name,self.first,'U'),
+                                    self.inletPatch,
+                                    keywords
+                                    )
+        vIn = None
+        for patchI in self.inletPatch:
+            for keyI in keywords:
+                value = entries[patchI].get(keyI)
+                if value is not None and value.startswith(b'uniform'):
+                    vIn = value.decode()
+                    break
+            if vIn is not None:
+                break
+        if vIn is None:
+            raise KeyError(
+                    "No uniform inlet velocity found for the patches %s" \
+                    %", ".join(self.inletPatch)
+                    )
 
         numberRe = compile(r"[+-]? *(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?")
         self.inletVelocity = [float(uI) for uI in findall(numberRe,vIn)]
@@ -250,35 +348,294 @@ class case(SolutionDirectory):
         self.Re = FlowProperties.Re(L=self.L,u=self.uInf)
         self.Fr = FlowProperties.Fr(L=self.L,u=self.uInf)
 
+    linkMode = None
+    """
+    How the files of :data:`OF.Settings.sharedCloneItems` are cloned, see
+    :meth:`cloneCase`
 
-            #self.inletVelocity = self.getDictionaryContents(self.first,'U')\
-                        #['boundaryField'][self.inletPatch]['value'].val
+    :type: string
+    """
 
-    def cloneCase(self,name,svnRemove=True,followSymlinks=False):
-        out = SolutionDirectory.cloneCase(
-                                    self,
-                                    name,
-                                    svnRemove=svnRemove,
-                                    followSymlinks=followSymlinks
-                                    )
+    def cloneCase(self,name,svnRemove=True,followSymlinks=False,linkMode=None):
+        """
+        Clones the case, like
+        :meth:`PyFoam.RunDictionary.SolutionDirectory.cloneCase`. The files
+        below :data:`OF.Settings.sharedCloneItems`, like the mesh, can be shared
+        with the clone instead of being copied:
+
+        * ``hard``: The files are hardlinked.
+        * ``reflink``: The files are copied with ``cp --reflink=always``, so
+          that they share their data until they are modified. This requires a
+          file system with copy-on-write support.
+
+        If a file cannot be linked, e.g. across file systems, it is copied.
+        Hardlinked files must not be modified in place, neither in the clone
+        nor in the original case, as the change would affect both.
+
+        :param name: Name of the new case
+        :type name: string
+        :param linkMode: ``hard``, ``reflink`` or ``None`` to copy everything
+            (optional, default=``None``)
+        :type linkMode: string
+
+        :rtype: :class:`case`
+        """
+        if linkMode not in (None,"hard","reflink"):
+            raise ValueError("Unknown link mode %s" %linkMode)
+
+        self.linkMode = linkMode
+        try:
+            out = SolutionDirectory.cloneCase(
+                                        self,
+                                        name,
+                                        svnRemove=svnRemove,
+                                        followSymlinks=followSymlinks
+                                        )
+        finally:
+            self.linkMode = None
         out.inletPatch = self.inletPatch
-        out.updateInletVelocity()
         return out
 
+    def copytree(self,src,dst,symlinks=False,force=False):
+        """
+        Copies a file or directory like
+        :meth:`PyFoam.RunDictionary.SolutionDirectory.copytree`, but links the
+        files of :data:`OF.Settings.sharedCloneItems`, if a :attr:`linkMode`
+        is set.
+        """
+        if self.linkMode is None:
+            return SolutionDirectory.copytree(
+                                            self,
+                                            src,
+                                            dst,
+                                            symlinks=symlinks,
+                                            force=force
+                                            )
+
+        if force and os.path.exists(dst):
+            if isdir(dst) and not islink(dst):
+                self.rmtree(dst)
+            else:
+                os.remove(dst)
+        if isdir(dst):
+            dst = join(dst,basename(abspath(src)))
+
+        if islink(src) and symlinks:
+            os.symlink(os.path.realpath(src),dst)
+        elif isdir(src):
+            os.mkdir(dst)
+            shutil.copystat(src,dst)
+            for fI in sorted(listdir(src)):
+                self.copytree(join(src,fI),dst,symlinks=symlinks)
+        elif self.isShared(src):
+            linkFile(src,dst,self.linkMode)
+        else:
+            shutil.copy2(src,dst)
+
+    def isShared(self,src):
+        """
+        Checks, if a path belongs to one of the
+        :data:`OF.Settings.sharedCloneItems` of the case. The processor
+        directories of a decomposed case are taken into account as well.
+
+        :param src: Path
+        :type src: string
+
+        :rtype: bool
+        """
+        parts = relpath(abspath(src),abspath(self.name)).split(os.sep)
+        if parts[0].startswith("processor"):
+            parts = parts[1:]
+        item = "/".join(parts)
+        for sI in Settings.sharedCloneItems:
+            if item == sI or item.startswith(sI + "/"):
+                return True
+        return False
+
     def createDataFile(self):
-        runTimeObj = None
+        """
+        Returns the data file of the forces function object, or ``False`` if
+        there is none. If the case has been restarted, the segments of all
+        start time directories are merged. If the same files have already been
+        read, only the lines appended since then are parsed.
 
-        for fI in listdir(self.name):
-            if fI in ("forces", "forcesFS", "resistance"):
-                runTimeObj = fI
-        
-        if not runTimeObj:
+        :rtype: :class:`~OF.PostProcessing.DataFile.dataFile`
+        """
+        paths = forcesPaths(self.name)
+        if not paths:
             return False
+        elif self.forces and self.forces.getPaths() == paths:
+            self.forces.refresh()
+            return self.forces
+        elif len(paths) == 1:
+            return DataFile.dataFile(
+                                    paths[0],
+                                    cache=Settings.cacheDataFiles,
+                                    columnMajor=True
+                                    )
         else:
-            path = join(
-                        self.name,
-                        runTimeObj,
-                        listdir(join(self.name,runTimeObj))[0],
-                        '%s.dat' %(runTimeObj)
-                        )
-            return DataFile.dataFile(path)
+            return DataFile.multiDataFile(
+                                    paths,
+                                    cache=Settings.cacheDataFiles,
+                                    columnMajor=True
+                                    )
+
+class caseResult():
+    """
+    Picklable summary of a :class:`case`, that holds the flow properties and
+    the resistances. It is returned by :func:`loadCases`, as complete case
+    objects can not be passed between processes.
+
+    :Author: Jens Hoepken <jhoepken@gmail.com>
+    """
+
+    error = None
+    """
+    Message of the error, that occurred while loading the case. ``None`` if
+    the case has been loaded successfully.
+
+    :type: string
+    """
+
+    def __init__(self, name, case=None, error=None):
+        """
+        :param name: Name of the solution directory
+        :type name: string
+        :param case: Loaded case (optional)
+        :type case: :class:`case`
+        :param error: Error message, if the case could not be loaded (optional)
+        :type error: string
+        """
+        self.name = name
+        self.shortCaseName = split(name)[1]
+        self.shortCasePath = None
+        self.error = error
+
+        self.Re = 0.0
+        self.Fr = 0.0
+        self.uInf = 0.0
+        self.t = None
+        self.resistances = {'CF':None,'CT':None,'RF':None,'RT':None}
+
+        if case:
+            self.shortCasePath = case.shortCasePath
+            self.Re = case.Re
+            self.Fr = case.Fr
+            self.uInf = case.uInf
+            self.t = case.t
+            self.resistances = dict(case.resistances)
+
+    def window(self, start=0.0, end=1.0, absolute=False):
+        """
+        Same as :meth:`case.window`
+
+        :rtype: slice
+        """
+        return DataFile.window(self.t, start, end, absolute)
+
+def forcesPaths(name):
+    """
+    Returns the paths of all segments of the data file of the forces function
+    object of a case, sorted by their start time. The list is empty, if there
+    is none.
+
+    :param name: Name of the solution directory
+    :type name: string
+
+    :rtype: list
+    """
+    runTimeObj = None
+
+    for fI in listdir(name):
+        if fI in forcesDirectories:
+            runTimeObj = fI
+
+    if not runTimeObj:
+        return []
+
+    return DataFile.segments(
+                            join(name,runTimeObj),
+                            '%s.dat' %(runTimeObj)
+                            )
+
+def linkFile(src,dst,linkMode):
+    """
+    Links a file as a hardlink or reflink, see :meth:`case.cloneCase`. The
+    file is copied, if the link cannot be created.
+
+    :param src: Source file
+    :type src: string
+    :param dst: Target file
+    :type dst: string
+    :param linkMode: ``hard`` or ``reflink``
+    :type linkMode: string
+    """
+    if linkMode == "hard":
+        try:
+            os.link(src,dst)
+            return
+        except OSError:
+            pass
+    elif linkMode == "reflink":
+        with open(os.devnull,"w") as null:
+            if subprocess.call(
+                            ["cp","--reflink=always","-p",src,dst],
+                            stderr=null
+                            ) == 0:
+                return
+    shutil.copy2(src,dst)
+
+def loadCase(task):
+    """
+    Loads a case, calculates the force coefficients and returns the results.
+    Errors are not raised, but stored in the result.
+
+    :param task: Name of the solution directory and the keyword arguments for
+        :class:`case`
+    :type task: tuple
+
+    :rtype: :class:`caseResult`
+    """
+    name, kwargs = task
+    try:
+        caseI = case(name, **kwargs)
+        caseI.calculateCoeffs()
+    except Exception as e:
+        return caseResult(name, error="%s: %s" %(e.__class__.__name__, e))
+    return caseResult(name, caseI)
+
+def loadCases(names, jobs=1, threads=False, **kwargs):
+    """
+    Loads multiple cases concurrently via :func:`loadCase` and returns the
+    results in the same order as the names. A case, that fails to load,
+    does not abort the others, but its result carries the error message.
+
+    Processes are used by default, as parsing is mostly bound by the
+    interpreter. Threads are sufficient, if the cases are located on a slow
+    file system and most of the time is spent waiting for it.
+
+    :param names: Names of the solution directories
+    :type names: list
+    :param jobs: Number of concurrent workers (optional, default=1)
+    :type jobs: int
+    :param threads: Use threads instead of processes (optional,
+        default=``False``)
+    :type threads: bool
+    :param kwargs: Keyword arguments, that are passed to :class:`case`
+
+    :rtype: list
+    """
+    tasks = [(nI, kwargs) for nI in names]
+
+    if jobs <= 1 or len(tasks) <= 1:
+        return [loadCase(tI) for tI in tasks]
+
+    if threads:
+        pool = ThreadPool(min(jobs, len(tasks)))
+    else:
+        pool = Pool(min(jobs, len(tasks)))
+    try:
+        return pool.map(loadCase, tasks, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
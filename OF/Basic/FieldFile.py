@@ -0,0 +1,480 @@
+#Copyright (C) 2013 Jens Hoepken
+
+#This program is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 2 of the License, or
+#(at your option) any later version.
+
+#This program is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#GNU General Public License for more details.
+
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+
+import io
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from os.path import abspath,basename,dirname
+
+import numpy
+
+"""
+This package contains a lightweight scanner for OpenFOAM dictionaries, like
+the field files in the time directories. Other than the parser of PyFoam, it
+does not build a representation of the whole file, but streams through it and
+reports the position of each entry. Counted lists, like the values of a
+``nonuniform`` field, are skipped without being tokenised. Only files in
+``ascii`` format are supported.
+"""
+
+chunkSize = 1 << 16
+"""
+Number of bytes, that are read at once.
+
+:type: int
+"""
+
+tokenRe = re.compile(br"""
+    (?P<space>\s+|//[^\n]*(?:\n|$)|/\*.*?\*/)
+    |(?P<token>[{};()]|"(?:[^"\\]|\\.)*"|(?:[^\s{};()"/]|/(?![/*]))+)
+    """, re.S|re.X)
+"""
+Compiled regular expression, that matches either whitespace and comments or a
+single token.
+"""
+
+listClosings = {
+                b"List<scalar>": 0,
+                b"List<label>": 0,
+                b"List<vector>": 1,
+                b"List<tensor>": 1,
+                b"List<symmTensor>": 1,
+                b"List<sphericalTensor>": 1
+                }
+"""
+Number of closing parentheses per element of a counted list, for all list
+types that can be skipped without tokenising them.
+
+:type: dict
+"""
+
+class tokenStream():
+    """
+    Splits a file into tokens, while reading it in chunks of
+    :data:`chunkSize` bytes. Each token is returned together with its absolute
+    byte position in the file.
+
+    :param stream: File opened in binary mode
+    :type stream: file
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = b""
+        self.pos = 0
+        self.base = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Drops the consumed part of the buffer and reads the next chunk.
+        Returns ``False`` at the end of the file.
+
+        :rtype: bool
+        """
+        chunk = self.stream.read(chunkSize)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.base += self.pos
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def next(self):
+        """
+        Returns the next token as a tuple of its content, start and end
+        position, or ``None`` at the end of the file.
+
+        :rtype: tuple
+        """
+        while True:
+            match = tokenRe.match(self.buffer, self.pos)
+
+            # A match that touches the end of the buffer might be incomplete.
+            if not match or match.end() == len(self.buffer):
+                if self.fill():
+                    continue
+                if not match:
+                    if self.pos < len(self.buffer):
+                        raise ValueError(
+                            "Unexpected content at byte %i" %(self.base + self.pos)
+                            )
+                    return None
+
+            self.pos = match.end()
+            if match.lastgroup == "token":
+                return (
+                        match.group(),
+                        self.base + match.start(),
+                        self.base + match.end()
+                        )
+
+    def skipClosing(self, count):
+        """
+        Skips everything up to and including the next ``count`` closing
+        parentheses and returns the position after the last one. The
+        parentheses are counted chunk by chunk, without tokenising.
+
+        :param count: Number of closing parentheses
+        :type count: int
+
+        :rtype: int
+        """
+        while True:
+            found = self.buffer.count(b")", self.pos)
+            if found >= count:
+                raw = numpy.frombuffer(self.buffer, dtype=numpy.uint8)
+                closings = numpy.flatnonzero(raw[self.pos:] == ord(")"))
+                self.pos += int(closings[count - 1]) + 1
+                return self.base + self.pos
+            count -= found
+            self.pos = len(self.buffer)
+            if not self.fill():
+                raise ValueError("Unexpected end of file inside a list")
+
+def entries(stream, closings=False):
+    """
+    Scans a dictionary file and yields a tuple for each entry, that is not a
+    sub dictionary itself. The tuple consists of:
+
+    * the scope, a tuple of the keywords of all enclosing sub dictionaries,
+      e.g. ``("boundaryField", "inlet")``
+    * the keyword
+    * the start and end position of the value in the file, the end being the
+      position of the terminating ``;``
+    * the tokens of the value joined by spaces. The content of counted lists
+      is replaced by ``(...)``.
+
+    Directives like ``#include`` are reported with their argument as the
+    value. As this is a generator, the scan can be stopped as soon as the
+    required entries have been found.
+
+    If requested, the end of each sub dictionary is reported as well, with the
+    scope of the sub dictionary, ``None`` as the keyword and the value and the
+    position of the closing brace.
+
+    :param stream: File opened in binary mode
+    :type stream: file
+    :param closings: Report the end of sub dictionaries (optional,
+        default=``False``)
+    :type closings: bool
+
+    :rtype: generator
+    """
+    tokens = tokenStream(stream)
+    scope = []
+
+    while True:
+        token = tokens.next()
+        if token is None:
+            return
+        elif token[0] == b"}":
+            if scope:
+                if closings:
+                    yield tuple(scope), None, token[1], token[2], None
+                scope.pop()
+            continue
+        elif token[0] == b";":
+            continue
+
+        keyword = token[0]
+        token = tokens.next()
+        if token is None:
+            return
+        elif token[0] == b"{":
+            scope.append(keyword)
+            continue
+        elif keyword.startswith(b"#"):
+            yield tuple(scope), keyword, token[1], token[2], token[0]
+            continue
+
+        start = token[1]
+        value = []
+        depth = 0
+        while depth or token[0] != b";":
+            if token[0] in (b"(", b"{"):
+                depth += 1
+            elif token[0] in (b")", b"}"):
+                depth -= 1
+            value.append(token[0])
+
+            if token[0] in listClosings:
+                # Counted list: the type is followed by the number of
+                # elements and the list itself.
+                nested = listClosings[token[0]]
+                token = tokens.next()
+                if token is None:
+                    break
+                try:
+                    size = int(token[0])
+                except ValueError:
+                    continue
+                value.append(token[0])
+
+                token = tokens.next()
+                if token is not None and token[0] == b"(":
+                    tokens.skipClosing(size*nested + 1)
+                    value.append(b"(...)")
+                    token = tokens.next()
+                if token is None:
+                    break
+                continue
+
+            token = tokens.next()
+            if token is None:
+                break
+
+        if token is None:
+            raise ValueError("Unexpected end of file in entry %s" %keyword)
+        yield tuple(scope), keyword, start, token[1], b" ".join(value)
+
+def patchEntries(path, patches, keywords=("value",)):
+    """
+    Reads certain entries of the given patches from the ``boundaryField`` of a
+    field file (see :func:`readPatchEntries`).
+
+    :param path: Path to the field file
+    :type path: string
+    :param patches: Names of the patches
+    :type patches: list
+    :param keywords: Keywords of the entries to read (optional,
+        default=``("value",)``)
+    :type keywords: tuple
+
+    :rtype: dict
+    """
+    with open(path, "rb") as stream:
+        return readPatchEntries(stream, patches, keywords)
+
+def readPatchEntries(stream, patches, keywords=("value",)):
+    """
+    Reads certain entries of the given patches from the ``boundaryField`` of a
+    field file. A patch is done, as soon as all of its entries have been found
+    or its sub dictionary ends, and the scan stops, once all patches are done
+    or the ``boundaryField`` ends. Returns a dict of dicts, with the patch
+    names and the keywords as keys and the values as returned by
+    :func:`entries`.
+
+    :param stream: File opened in binary mode
+    :type stream: file
+    :param patches: Names of the patches
+    :type patches: list
+    :param keywords: Keywords of the entries to read (optional,
+        default=``("value",)``)
+    :type keywords: tuple
+
+    :rtype: dict
+    """
+    patches = [pI.encode() for pI in patches]
+    keywords = [kI.encode() for kI in keywords]
+    out = dict((pI, {}) for pI in patches)
+    pending = set(patches)
+
+    for scope, keyword, start, end, value in entries(stream, closings=True):
+        if not scope or scope[0] != b"boundaryField":
+            continue
+        elif len(scope) == 1:
+            if keyword is None:
+                break
+        elif len(scope) == 2 and scope[1] in pending:
+            if keyword is None:
+                pending.discard(scope[1])
+            elif keyword in keywords and keyword not in out[scope[1]]:
+                out[scope[1]][keyword] = value
+                if len(out[scope[1]]) == len(keywords):
+                    pending.discard(scope[1])
+            if not pending:
+                break
+
+    return dict(
+                (pI.decode(), dict((kI.decode(), vI) for kI, vI in eI.items()))
+                for pI, eI in out.items()
+                )
+
+@contextmanager
+def atomicFile(path):
+    """
+    Context manager, that provides a file opened in binary mode for writing,
+    which replaces the file at the given path once the context is left. The
+    content is written to a temporary file in the same directory at first, so
+    that the target is never left partially written. If the context is left
+    with an exception, the target is not touched.
+
+    :param path: Path of the file to write
+    :type path: string
+
+    :rtype: file
+    """
+    handle, tmp = tempfile.mkstemp(
+                                dir=dirname(abspath(path)),
+                                prefix=".%s." %basename(path)
+                                )
+    try:
+        with os.fdopen(handle, "wb") as stream:
+            yield stream
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        os.rename(tmp, path)
+    except:
+        os.remove(tmp)
+        raise
+
+def writeParsedFile(parsed):
+    """
+    Writes a file, that has been parsed by PyFoam, e.g. a
+    ``ParsedParameterFile``, with its own serialisation. A file, that has
+    been read compressed, is written compressed again. Like
+    :func:`atomicFile`, the content is written to a temporary file in the
+    same directory at first, which then replaces the file.
+
+    :param parsed: Parsed file
+    :type parsed: ParsedParameterFile
+    """
+    path = parsed.realName()
+    handle, tmp = tempfile.mkstemp(
+                                dir=dirname(abspath(path)),
+                                prefix=".%s." %parsed.baseName()
+                                )
+    os.close(handle)
+
+    # PyFoam appends .gz to the name of a compressed file.
+    written = tmp
+    if parsed.zipped:
+        written += ".gz"
+    try:
+        parsed.writeFileAs(tmp)
+        if os.path.exists(path):
+            shutil.copymode(path, written)
+        os.rename(written, path)
+    finally:
+        for fI in (tmp, written):
+            if os.path.exists(fI):
+                os.remove(fI)
+
+def replaceSpans(path, replacements):
+    """
+    Rewrites a file with certain byte ranges replaced, e.g. the values of the
+    entries found by :func:`entries`. Everything else is copied in chunks of
+    :data:`chunkSize` bytes without being tokenised. The file is replaced
+    atomically, see :func:`atomicFile`.
+
+    :param path: Path to the file
+    :type path: string
+    :param replacements: Tuples of the start and end position of each range
+        and the text to replace it with. Ranges with the same start and end
+        position insert the text. The ranges must not overlap.
+    :type replacements: list
+    """
+    with open(path, "rb") as source:
+        with atomicFile(path) as target:
+            pos = 0
+            for start, end, text in sorted(replacements):
+                while pos < start:
+                    chunk = source.read(min(chunkSize, start - pos))
+                    if not chunk:
+                        raise ValueError("Replacement beyond the end of %s" %path)
+                    target.write(chunk)
+                    pos += len(chunk)
+                target.write(text)
+                source.seek(end)
+                pos = end
+            shutil.copyfileobj(source, target, chunkSize)
+
+class fieldTemplate():
+    """
+    Text of a dictionary file, that has been scanned once by :func:`entries`,
+    so that variants of it can be generated by replacing the values of some
+    entries. This avoids parsing the same file again for each variant, e.g. the
+    field files of a template case for all cases of a parameter sweep.
+
+    :param path: Path to the file
+    :type path: string
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.text = f.read()
+        """
+        Content of the file
+
+        :type: bytes
+        """
+
+        self.entries = list(entries(io.BytesIO(self.text)))
+        """
+        Entries of the file, as returned by :func:`entries`
+
+        :type: list
+        """
+
+        self.index = dict(
+                        ((sI, kI), (start, end, vI))
+                        for sI, kI, start, end, vI in self.entries
+                        )
+
+    def find(self, scope, keyword):
+        """
+        Returns the start and end position and the value of an entry, or
+        ``None`` if there is no such entry.
+
+        :param scope: Keywords of the enclosing sub dictionaries
+        :type scope: tuple
+        :param keyword: Keyword of the entry
+        :type keyword: string
+
+        :rtype: tuple
+        """
+        return self.index.get(
+                        (tuple(sI.encode() for sI in scope), keyword.encode())
+                        )
+
+    def render(self, replacements):
+        """
+        Returns the text with certain byte ranges replaced, see
+        :func:`replaceSpans`.
+
+        :param replacements: Tuples of the start and end position of each range
+            and the text to replace it with
+        :type replacements: list
+
+        :rtype: bytes
+        """
+        out = []
+        pos = 0
+        for start, end, text in sorted(replacements):
+            out.append(self.text[pos:start])
+            out.append(text)
+            pos = end
+        out.append(self.text[pos:])
+        return b"".join(out)
+
+    def write(self, path, replacements):
+        """
+        Writes the text with certain byte ranges replaced to a file, which is
+        replaced atomically, see :func:`atomicFile`.
+
+        :param path: Path to write to
+        :type path: string
+        :param replacements: Tuples of the start and end position of each range
+            and the text to replace it with
+        :type replacements: list
+        """
+        with atomicFile(path) as f:
+            f.write(self.render(replacements))
@@ -15,11 +15,14 @@
 #Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
 
 
-from math import sqrt
+from numpy import sqrt
 from OF import Constants
 
 """
 This package contains some descriptive flow parameters, that are used regularly.
+All of them accept numpy arrays instead of floats, which are broadcast against
+each other, e.g. to evaluate a grid of velocities and reference lengths at
+once.
 """
 
 def Re(**kwargs):
@@ -37,15 +40,15 @@ def Re(**kwargs):
     parameter, the velocity is returned.
     
     :param u: velocity
-    :type u: float
+    :type u: float or numpy.ndarray
     :param Re: Reynoldsnumber
-    :type Re: float
+    :type Re: float or numpy.ndarray
     :param Fr: Froudenumber
-    :type Fr: float
+    :type Fr: float or numpy.ndarray
     :param L: Reference length
-    :type L: float
+    :type L: float or numpy.ndarray
     :param nu: Kinematic viscosity
-    :type nu: float
+    :type nu: float or numpy.ndarray
 
     :Author: Jens Hoepken <jhoepken@gmail.com>
     """
@@ -78,15 +81,15 @@ def Fr(**kwargs):
     parameter, the velocity is returned.
     
     :param u: Velocity
-    :type u: float
+    :type u: float or numpy.ndarray
     :param Re: Reynoldsnumber
-    :type Re: float
+    :type Re: float or numpy.ndarray
     :param Fr: Froudenumber
-    :type Fr: float
+    :type Fr: float or numpy.ndarray
     :param L: Reference length
-    :type L: float
+    :type L: float or numpy.ndarray
     :param nu: Kinematic viscosity
-    :type nu: float
+    :type nu: float or numpy.ndarray
 
     :Author: Jens Hoepken <jhoepken@gmail.com>
     """
@@ -112,33 +115,30 @@ def uFrRe(**kwargs):
     """
     velocityParams = ['u','Re','Fr']
 
-    pCount = 0
+    # Velocity definitions, that are passed as None are treated as missing
+    given = [uI for uI in velocityParams if kwargs.get(uI) is not None]
     for uI in velocityParams:
-        if uI in kwargs.iterkeys():
-            pCount += 1
-    
+        if uI not in given:
+            kwargs.pop(uI,None)
 
-    if not kwargs['u'] and not kwargs['Re'] and not kwargs['Fr']:
+    if not given:
         raise ValueError("Neither u nor Re and Fr have been provided")
-    elif pCount > 1 :
+    elif len(given) > 1 :
         raise ValueError("Too many velocity definitions (Re, u, Fr)")
 
     if not 'L' in kwargs.iterkeys():
         raise ValueError("A reference length has to be specified")
 
-    if kwargs['u']:
-        u_ = kwargs['u']
-        Fr_ = Fr(**kwargs)
-        Re_ = Re(**kwargs)
-
-    elif kwargs['Fr']:
+    if 'u' in given:
+        u_ = kwargs.pop('u')
+    elif 'Fr' in given:
         u_ = Fr(**kwargs)
-        Fr_ = kwargs['Fr']
-        Re_ = Re(**kwargs)
-
-    elif kwargs['Re']:
+        kwargs.pop('Fr')
+    else:
         u_ = Re(**kwargs)
-        Fr_ = Fr(**kwargs)
-        Re_ = kwargs['Re']
+        kwargs.pop('Re')
+
+    Fr_ = Fr(u=u_,**kwargs)
+    Re_ = Re(u=u_,**kwargs)
 
     return u_,Fr_,Re_
@@ -15,17 +15,26 @@
 #Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
 
 
-from os.path import join
+from os.path import getsize,isfile,join
 from math import sqrt
 
 from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
 
 from OF import Constants
+from OF.Basic import FieldFile
 """
 This package contains some untilities to handle the turbulence modelling and
 provide easy access to the initialisation of the field variables.
 """
 
+streamingSize = 1 << 20
+"""
+Size in bytes, from which on the field files are patched as text by
+:meth:`initFieldFoam.write`, instead of being parsed.
+
+:type: int
+"""
+
 class initField():
     """
     Provides access to the initialisation of the turbulence related field
@@ -144,34 +153,126 @@ class initFieldFoam(initField):
             self.turbBC = ['k','omega']
 
 
-    def write(self):
+    def write(self,streaming=None,templates=None):
         """
         Updates the values for the turbulent flow properties and writes all
         **turbulent** boundary files. Wallfunctions, if used, are updated as
-        well.
+        well. Each file is read once, all of its updates are applied together
+        and it is replaced atomically.
+
+        :param streaming: Patch the files as text, see :meth:`patchField`,
+            instead of parsing them with PyFoam (optional). By default, files
+            larger than :data:`streamingSize` are patched. Compressed files
+            are always parsed.
+        :type streaming: bool
+        :param templates: Field templates by the name of the field (optional).
+            The files of these fields are not read, but rendered from the
+            template, see :class:`~OF.Basic.FieldFile.fieldTemplate`.
+        :type templates: dict
         """
+        if templates is None:
+            templates = {}
+
         for bcI in self.turbBC:
-            for inletPatchI in self.case.inletPatch:
-                bcFile = ParsedParameterFile(
-                                            join(
-                                                self.case.name,
-                                                self.case.first,
-                                                bcI
-                                                )
-                                            )
-                # Set the internal field and the inlet patch at first
-                bcFile['internalField'] = "uniform %f" %(self.vars[bcI])
-                bcFile['boundaryField'][inletPatchI]['value'] = \
-                                                "uniform %f" %(self.vars[bcI])
-
-                # Update the wallfunctions if they are used
-                for patchI in bcFile['boundaryField']:
-
-                    if "allFunction" in bcFile['boundaryField'][patchI]['type']:
-                        bcFile['boundaryField'][patchI]['value'] = \
-                                                "uniform %f" %(self.vars[bcI])
-
-                # Write the current boundary file
-                bcFile.writeFile()
+            path = join(self.case.name,self.case.first,bcI)
+            value = "uniform %f" %(self.vars[bcI])
+
+            if bcI in templates:
+                templates[bcI].write(
+                                path,
+                                self.replacements(templates[bcI].entries,value)
+                                )
+            elif not isfile(path):
+                # Compressed files are left to PyFoam
+                self.updateField(path,value)
+            elif streaming or (streaming is None and getsize(path) > streamingSize):
+                self.patchField(path,value)
+            else:
+                self.updateField(path,value)
+
+    def updateField(self,path,value):
+        """
+        Parses a field file, sets the internal field, the inlet patches and
+        the wallfunctions to a value and writes it again. Compressed files are
+        supported, see :func:`~OF.Basic.FieldFile.writeParsedFile`.
+
+        :param path: Path to the field file
+        :type path: string
+        :param value: New value
+        :type value: string
+        """
+        bcFile = ParsedParameterFile(path)
+
+        # Set the internal field and the inlet patches at first
+        bcFile['internalField'] = value
+        for inletPatchI in self.case.inletPatch:
+            bcFile['boundaryField'][inletPatchI]['value'] = value
+
+        # Update the wallfunctions if they are used. Entries without a
+        # dictionary, like directives and macros, are skipped.
+        for patchI in bcFile['boundaryField']:
+            patch = bcFile['boundaryField'][patchI]
+            if isinstance(patch,dict) and "allFunction" in patch.get('type',''):
+                patch['value'] = value
 
+        FieldFile.writeParsedFile(bcFile)
+
+    def patchField(self,path,value):
+        """
+        Does the same as :meth:`updateField`, but replaces only the text of the
+        affected entries. The rest of the file, especially the values of a
+        ``nonuniform`` internal field, is copied without being parsed. Patches
+        without a ``value`` entry get one after their ``type``.
+
+        :param path: Path to the field file
+        :type path: string
+        :param value: New value
+        :type value: string
+        """
+        with open(path,"rb") as stream:
+            replacements = self.replacements(FieldFile.entries(stream),value)
+
+        FieldFile.replaceSpans(path,replacements)
+
+    def replacements(self,entries,value):
+        """
+        Returns the byte ranges of a field file, that are replaced by
+        :meth:`patchField`, together with the new text.
+
+        :param entries: Entries of the field file, as returned by
+            :func:`~OF.Basic.FieldFile.entries`
+        :type entries: list
+        :param value: New value
+        :type value: string
+
+        :rtype: list
+        """
+        value = value.encode()
+        inletPatches = [pI.encode() for pI in self.case.inletPatch]
+        internalField = None
+        patches = {}
+
+        for scope,keyword,start,end,v in entries:
+            if scope == () and keyword == b"internalField":
+                internalField = (start,end)
+            elif len(scope) == 2 and scope[0] == b"boundaryField":
+                patches.setdefault(scope[1],{})[keyword] = (start,end,v)
+
+        if internalField is None:
+            raise KeyError("internalField")
+        replacements = [internalField + (value,)]
+
+        for patchI in inletPatches:
+            if patchI not in patches:
+                raise KeyError(patchI)
+        for patchI,entriesI in patches.items():
+            if patchI in inletPatches or \
+                b"allFunction" in entriesI.get(b"type",(0,0,b""))[2]:
+                if b"value" in entriesI:
+                    replacements.append(entriesI[b"value"][:2] + (value,))
+                else:
+                    end = entriesI[b"type"][1] + 1
+                    replacements.append((end,end,b" value " + value + b";"))
+
+        return replacements
 
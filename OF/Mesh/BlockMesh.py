@@ -16,13 +16,339 @@
 
 
 from os.path import join
-from copy import deepcopy
-from math import sqrt
-from numpy import arange
+from math import floor,sqrt
+from numpy import absolute,arange,asarray,broadcast_arrays,errstate,exp
+from numpy import expm1,full_like,isnan,log,nan,nonzero,ones,where,zeros
 
 from PyFoam.Basics.DataStructures import Vector
-from PyFoam.Basics.TemplateFile import TemplateFile
-from PyFoam.RunDictionary.ParsedBlockMeshDict import ParsedBlockMeshDict
+
+chunkSize = 4096
+"""
+Number of vertices, blocks or faces, that are formatted and written to the
+``blockMeshDict`` at once.
+
+:type: int
+"""
+
+header = """FoamFile
+{
+    version     2.0;
+    format      ascii;
+    class       dictionary;
+    object      blockMeshDict;
+}
+
+convertToMeters 1.0;
+"""
+"""
+Beginning of the ``blockMeshDict``, up to the lists of the mesh.
+
+:type: string
+"""
+
+faceVertices = (
+                (4,7,3,0),
+                (6,5,1,2),
+                (5,4,0,1),
+                (7,6,2,3),
+                (3,2,1,0),
+                (4,5,6,7)
+                )
+"""
+Local vertex numbers of the 6 faces of a block (xmin, xmax, ymin, ymax, zmin,
+zmax).
+
+:type: tuple
+"""
+
+class meshStorage:
+    """
+    Compact storage of the vertices and blocks of a blockMesh in numpy arrays,
+    which grow as required. The :class:`vertex`, :class:`block` and
+    :class:`face` instances are only views onto these arrays. Rows that are
+    returned by the views, must not be kept, as the arrays are reallocated
+    while growing.
+
+    :param capacity: Initial number of vertices and blocks (optional)
+    :type capacity: int
+    """
+
+    def __init__(self,capacity=64):
+        self.points = zeros((capacity,3))
+        """
+        Coordinates of the vertices
+
+        :type: numpy.ndarray
+        """
+
+        self.pointCount = 0
+
+        self.blocks = zeros((capacity,8),dtype=int)
+        """
+        Vertex ids of the blocks
+
+        :type: numpy.ndarray
+        """
+
+        self.nodes = zeros((capacity,3),dtype=int)
+        """
+        Cells of the blocks in each direction, with 0 if undefined
+
+        :type: numpy.ndarray
+        """
+
+        self.gradings = zeros((capacity,3))
+        """
+        Gradings of the blocks in each direction, with 0 if undefined
+
+        :type: numpy.ndarray
+        """
+
+        self.adjusted = zeros((capacity,3),dtype=bool)
+        """
+        Marks gradings, that have been set by :meth:`block.adjustGrading`
+
+        :type: numpy.ndarray
+        """
+
+        self.neighbours = -ones((capacity,6),dtype=int)
+        """
+        Ids of the neighbouring blocks for each face, with -1 if there is none
+
+        :type: numpy.ndarray
+        """
+
+        self.boundary = ones((capacity,6),dtype=bool)
+        """
+        Marks the faces of the blocks, that are not shared with another block
+
+        :type: numpy.ndarray
+        """
+
+        self.blockCount = 0
+
+    def addPoint(self,p):
+        """
+        Appends a vertex and returns its id.
+
+        :param p: Coordinates
+        :type p: tuple
+
+        :rtype: int
+        """
+        if self.pointCount == len(self.points):
+            self.points = grow(self.points,0.0)
+        self.points[self.pointCount] = (float(p[0]),float(p[1]),float(p[2]))
+        self.pointCount += 1
+        return self.pointCount - 1
+
+    def addBlock(self,vertexIds):
+        """
+        Appends a block and returns its id.
+
+        :param vertexIds: Ids of the 8 vertices
+        :type vertexIds: list
+
+        :rtype: int
+        """
+        if self.blockCount == len(self.blocks):
+            self.blocks = grow(self.blocks,0)
+            self.nodes = grow(self.nodes,0)
+            self.gradings = grow(self.gradings,0.0)
+            self.adjusted = grow(self.adjusted,False)
+            self.neighbours = grow(self.neighbours,-1)
+            self.boundary = grow(self.boundary,True)
+        self.blocks[self.blockCount] = vertexIds
+        self.blockCount += 1
+        return self.blockCount - 1
+
+def grow(array,fill):
+    """
+    Returns a copy of an array with twice the number of rows. The new rows are
+    filled with a constant value.
+
+    :param array: Array to grow
+    :type array: numpy.ndarray
+    :param fill: Value for the new rows
+
+    :rtype: numpy.ndarray
+    """
+    out = zeros((2*len(array),) + array.shape[1:],dtype=array.dtype)
+    out[:len(array)] = array
+    out[len(array):] = fill
+    return out
+
+def setRow(array,row,values):
+    """
+    Assigns the values of a dict or list with the keys 0..n-1 to a row of an
+    array. Missing or ``False`` values are stored as 0.
+
+    :param array: Target array
+    :type array: numpy.ndarray
+    :param row: Row to assign
+    :type row: int
+    :param values: Values
+    :type values: dict
+    """
+    for i in range(array.shape[1]):
+        try:
+            array[row,i] = values[i]
+        except (KeyError,IndexError):
+            array[row,i] = 0
+
+class meshRegistry:
+    """
+    Holds everything, that belongs to the construction of one mesh: the
+    :class:`meshStorage` as well as the lists and lookup tables of the blocks,
+    vertices, edges and faces. Blocks of different registries are completely
+    independent, so that several meshes can be generated in one process, each
+    with memory and lookup costs that only depend on its own size.
+
+    :param tolerance: Snapping tolerance for vertices (optional, default=0)
+    :type tolerance: float
+    :param capacity: Initial capacity of the storage (optional)
+    :type capacity: int
+    """
+
+    def __init__(self,tolerance=0.0,capacity=64):
+        self.storage = meshStorage(capacity)
+        """
+        Stores the vertices and the data of all blocks.
+
+        :type: :class:`meshStorage`
+        """
+
+        self.tolerance = tolerance
+        """
+        Snapping tolerance for vertices. Coordinates that differ by no more
+        than the tolerance in each direction refer to the same vertex. With a
+        tolerance of 0, only identical coordinates are merged. The tolerance
+        must not be changed after the first block has been created.
+
+        :type: float
+        """
+
+        self.blocks = []
+        """
+        Stores all blocks.
+
+        :type: list
+        """
+
+        self.vertexIndex = {}
+        """
+        Maps the snapped coordinates of all vertices to their ids, see
+        :meth:`block.findVertex`.
+
+        :type: dict
+        """
+
+        self.edges = []
+        """
+        Stores all edges.
+
+        :type: list
+        """
+
+        self.edgeIndex = {}
+        """
+        Maps the ordered pair of vertex ids of all edges to the edges.
+
+        :type: dict
+        """
+
+        self.faceIndex = {}
+        """
+        Maps the sorted vertex ids of all faces to the id of the block and the
+        number of the face, that has been registered first.
+
+        :type: dict
+        """
+
+        self.chains = {}
+        """
+        Caches the chains of blocks, see :meth:`block.chain`. The keys are the
+        block id and the direction. All blocks of a chain share the same list,
+        which is discarded as soon as one of them gets a new neighbour in that
+        direction.
+
+        :type: dict
+        """
+
+    def addVertex(self,v):
+        """
+        Checks if certain coordinates v already exist as a vertex and returns
+        its id. Otherwise the coordinates are appended to the storage and
+        registered in :attr:`vertexIndex`.
+
+        :param v: Coordinates to be checked and added
+        :type v: tuple
+
+        :rtype: int
+        """
+        vId = self.findVertex(v)
+        if vId is None:
+            vId = self.storage.addPoint(v)
+            self.vertexIndex.setdefault(self.snap(v),[]).append(vId)
+        return vId
+
+    def snap(self,v):
+        """
+        Returns the key of the coordinates v in :attr:`vertexIndex`. With a
+        :attr:`tolerance`, this is the index of the cell of a grid with the
+        tolerance as spacing, that contains the coordinates.
+
+        :param v: Coordinates
+        :type v: tuple
+
+        :rtype: tuple
+        """
+        if self.tolerance:
+            return tuple(int(floor(float(v[i])/self.tolerance)) for i in range(3))
+        return (float(v[0]),float(v[1]),float(v[2]))
+
+    def findVertex(self,v):
+        """
+        Returns the id of the existing vertex for the coordinates v, or ``None``
+        if there is none. With a :attr:`tolerance`, all vertices in the adjoining cells of
+        the snapping grid are compared as well.
+
+        :param v: Coordinates
+        :type v: tuple
+
+        :rtype: int
+        """
+        key = self.snap(v)
+        if not self.tolerance:
+            try:
+                return self.vertexIndex[key][0]
+            except KeyError:
+                return None
+
+        for i in (-1,0,1):
+            for j in (-1,0,1):
+                for k in (-1,0,1):
+                    for vI in self.vertexIndex.get((key[0]+i,key[1]+j,key[2]+k),[]):
+                        p = self.storage.points[vI]
+                        if abs(p[0]-v[0]) <= self.tolerance and \
+                           abs(p[1]-v[1]) <= self.tolerance and \
+                           abs(p[2]-v[2]) <= self.tolerance:
+                            return vI
+        return None
+
+def registryProperty(name):
+    """
+    Returns a read-only property, that refers to an attribute of the
+    :class:`meshRegistry` of a block.
+
+    :param name: Name of the attribute of the registry
+    :type name: string
+
+    :rtype: property
+    """
+    def get(self):
+        return getattr(self.registry,name)
+    return property(get,doc="See :attr:`meshRegistry.%s`" %name)
 
 class blockMesh:
     """
@@ -33,6 +359,10 @@ class blockMesh:
 
     :param case: Case to create the ``blockMeshDict`` in
     :type case: SolutionDirectory
+    :param registry: Registry of the blocks of the mesh (optional). If omitted,
+        the mesh creates a registry of its own, so that the vertices and blocks
+        of several meshes are independent of each other.
+    :type registry: :class:`meshRegistry`
 
     :Author: Jens Hoepken <jhoepken@gmail.com>
     :Version: 1.0
@@ -41,17 +371,36 @@ class blockMesh:
 
     def __init__(
                 self,
-                case
+                case,
+                registry=None
                 ):
 
         self.case = case
 
         self.blocks = []
 
-        self.vertices = []
+        if registry is None:
+            registry = meshRegistry()
+
+        self.registry = registry
+        """
+        Registry, that all blocks of the mesh belong to. Blocks are created in
+        it by :meth:`createBlock` or by passing it to :class:`block`.
+
+        :type: :class:`meshRegistry`
+        """
 
         self.patches = []
 
+        self.conflicts = []
+        """
+        Stores the conflicts, that have been resolved by :meth:`check`. Each
+        conflict is a tuple of the attribute (``nodes`` or ``gradings``), the
+        direction and the ids of the blocks, that had different values.
+
+        :type: list
+        """
+
 
     def patchEntries(self):
         """
@@ -78,40 +427,160 @@ class blockMesh:
         """
         self.patches += patches
 
+    def createBlock(self,points,*args,**kwargs):
+        """
+        Creates a block in the registry of the mesh. The arguments are the same
+        as for :class:`block`. The block is not added to the mesh, which is
+        done by :meth:`addBlocks`.
+
+        :param points: Points to construct the block from (either 8 or 2)
+        :type points: list
+
+        :rtype: :class:`block`
+        """
+        kwargs['registry'] = self.registry
+        return block(points,*args,**kwargs)
+
     def addBlocks(self,blocks):
         """
-        Adds a list of blocks to the mesh. 
+        Adds a list of blocks to the mesh. All blocks have to belong to the
+        :class:`meshRegistry` of the mesh, see :meth:`createBlock`.
 
         :param blocks: Blocks to add
         :type blocks: list
         """
+        for bI in blocks:
+            if bI.registry is not self.registry:
+                raise ValueError(
+                    "Block %i belongs to another registry than the mesh, "
+                    "create it with blockMesh.createBlock" %bI.id
+                    )
         self.blocks += blocks
 
-        # As all vertices are stored in a global list in the block class, only
-        # the first item of the blocks needs to be accessed to gather all
-        # vertices
-        self.vertices = blocks[0].vertices
+    @property
+    def storage(self):
+        """
+        Storage of the vertices and blocks of the mesh
 
-    def check(self):
+        :type: :class:`meshStorage`
         """
-        Checks all blocks
+        return self.registry.storage
+
+    def build(self):
+        """
+        Resolves the neighbours of all blocks of the mesh in a single pass over
+        their faces. Links to blocks, that have not been added to the mesh, are
+        removed.
         """
         for bI in self.blocks:
-            bI.checkNodes()
+            for dirI in range(0,3):
+                bI.invalidateChain(dirI)
+            bI.neighbours = {}
+            bI.storage.boundary[bI.id] = True
 
-    def getVertices(self):
+        faces = {}
+        for bI in self.blocks:
+            for fId,kI in enumerate(bI.faceKeys()):
+                other,otherFace = faces.setdefault(kI,(bI,fId))
+                if other is not bI:
+                    link(bI,fId,other,otherFace)
+
+    def check(self):
         """
-        Returns all vertices, but filters the ones which are only a reference.
+        Checks the number of nodes and the gradings of all blocks. Neighbouring
+        blocks share the edges along their common face, so that the nodes and
+        gradings of these directions have to be identical. All block directions,
+        that are connected this way, are grouped into classes and each class
+        gets a common value. This is the value of an adjusted grading (see
+        :meth:`block.adjustGrading`), or otherwise the value of the block with
+        the lowest id, that has one.
+
+        Conflicting values are stored in :attr:`conflicts`. If one of the
+        blocks of a conflict must not be adjusted, a ValueError is raised
+        instead.
+        """
+        self.build()
+        self.conflicts = []
+
+        # Translate the neighbour ids into positions in the list of blocks and
+        # collect each pair of neighbours once
+        ids = asarray([bI.id for bI in self.blocks],dtype=int)
+        position = -ones(self.storage.blockCount,dtype=int)
+        position[ids] = arange(len(ids))
+        neighbours = self.storage.neighbours[ids]
+
+        pairs = []
+        for faceI in range(0,6):
+            own = nonzero(neighbours[:,faceI] >= 0)[0]
+            other = position[neighbours[own,faceI]]
+            mask = other > own
+            own = own[mask]
+            other = other[mask]
+            for dirI in range(0,3):
+                if dirI != faceI//2:
+                    pairs += zip(3*own + dirI,3*other + dirI)
+
+        classes = {}
+        for elementI,classI in enumerate(equivalenceClasses(3*len(self.blocks),pairs)):
+            classes.setdefault(classI,[]).append(elementI)
+
+        for classI in sorted(classes.iterkeys()):
+            members = [self.blocks[eI//3] for eI in classes[classI]]
+            dirI = classI%3
+            if len(members) > 1:
+                self.resolve(members,dirI,'nodes','noNodeAdjustment')
+                self.resolve(members,dirI,'gradings','noGradingAdjustment')
+
+    def resolve(self,blocks,dir,attribute,fixed):
+        """
+        Assigns a common value of the nodes or gradings to all blocks of a
+        class, as described in :meth:`check`.
 
-        :rtype: list
+        :param blocks: Blocks of the class
+        :type blocks: list
+        :param dir: Direction (0,1,2)
+        :type dir: int
+        :param attribute: Either ``nodes`` or ``gradings``
+        :type attribute: string
+        :param fixed: Attribute of the blocks, that prevents an adjustment
+        :type fixed: string
         """
-        output = []
+        defined = sorted(
+                    [
+                    (not (attribute == 'gradings' and bI.adjusted[dir]),bI.id,bI)
+                    for bI in blocks if getattr(bI,attribute)[dir]
+                    ]
+                    )
+        if not defined:
+            return
+        value = getattr(defined[0][2],attribute)[dir]
+
+        conflicting = [
+                    idI for adjustedI,idI,bI in defined
+                    if getattr(bI,attribute)[dir] != value
+                    ]
+        if conflicting:
+            ids = sorted([defined[0][1]] + conflicting)
+            if any(getattr(bI,fixed) for bI in blocks):
+                raise ValueError(
+                        "%s mismatch in direction %i for the blocks %s" \
+                        %(attribute.capitalize(),dir,ids)
+                        )
+            self.conflicts.append((attribute,dir,ids))
 
-        for vI in self.vertices:
-            if not vI.duplicate:
-                output.append(vI)
+        for bI in blocks:
+            getattr(bI,attribute)[dir] = value
 
-        return output
+    def getVertices(self):
+        """
+        Returns all vertices.
+
+        :rtype: list
+        """
+        return [
+                vertex.view(self.storage,i)
+                for i in range(self.storage.pointCount)
+                ]
 
     def getBlocks(self):
         """
@@ -123,13 +592,7 @@ class blockMesh:
         
         output = []
         for blockI in self.blocks:
-            blockVertices = []
-            for vI in blockI.ownVertices:
-                try:
-                    blockVertices.append(str(vI.id))
-                except AttributeError:
-                    blockVertices.append(str(vI))
-            v = " ".join(blockVertices)
+            v = " ".join([str(vI) for vI in self.storage.blocks[blockI.id]])
             output.append("hex (%s) (%i %i %i) simpleGrading (%f %f %f)" %(v,
                                                                 blockI.nodes[0],
                                                                 blockI.nodes[1],
@@ -147,49 +610,67 @@ class blockMesh:
         """
         self.check()
 
-        target = join(self.case.polyMeshDir(),"blockMeshDict")
+        with open(join(self.case.polyMeshDir(),"blockMeshDict"),"w") as f:
+            self.writeStream(f)
 
-        template = TemplateFile(content="""
-FoamFile
-{
-	version     2.0;
-	format      ascii;
-	class       dictionary;
-	object      blockMeshDict;
-}
-convertToMeters    1.0;
-vertices
-(
-);
-blocks
-(
-);
-
-patches
-(
-);
-edges
-();
-// ************************************************************************* //
-""")
-
-        template.writeToFile(target,{})
-        template = ParsedBlockMeshDict(
-                                        join(
-                                            self.case.polyMeshDir(),
-                                            'blockMeshDict'
-                                            )
-                                        )
-        # Adopted from
-        # http://stackoverflow.com/questions/952914/making-a-flat-list-out-of-list-of-lists-in-python
-        #template['vertices'] = self.getVertices() #[bI for blockI in self.blocks for bI in blockI.vertices]
-        template['vertices'] = self.getVertices()
-
-        template['blocks'] = self.getBlocks()
-
-        template['patches'] = self.patchEntries()
-
-        template.writeFile()
+    def writeStream(self,stream):
+        """
+        Writes the content of the ``blockMeshDict`` to a stream. The vertices,
+        blocks and faces are formatted directly from the arrays of the
+        :attr:`storage`, in chunks of :data:`chunkSize` entries, without
+        building the dictionary in memory. The mesh is not checked, see
+        :meth:`write`.
+
+        Edges are only written, if they are curved. As :class:`edge` does not
+        store the points of curved edges, the list is always empty.
+
+        :param stream: Stream to write to
+        :type stream: file
+        """
+        stream.write(header)
+
+        points = self.storage.points
+        stream.write("\nvertices\n(\n")
+        for i in range(0,self.storage.pointCount,chunkSize):
+            rows = points[i:min(i + chunkSize,self.storage.pointCount)]
+            stream.write("".join([
+                            "    (%.15g %.15g %.15g)\n" %tuple(pI)
+                            for pI in rows.tolist()
+                            ]))
+        stream.write(");\n")
+
+        ids = asarray([bI.id for bI in self.blocks],dtype=int)
+        stream.write("\nblocks\n(\n")
+        for i in range(0,len(ids),chunkSize):
+            rows = ids[i:i + chunkSize]
+            stream.write("".join([
+                "    hex (%i %i %i %i %i %i %i %i) (%i %i %i) "
+                "simpleGrading (%.15g %.15g %.15g)\n" %tuple(vI + nI + gI)
+                for vI,nI,gI in zip(
+                                    self.storage.blocks[rows].tolist(),
+                                    self.storage.nodes[rows].tolist(),
+                                    self.storage.gradings[rows].tolist()
+                                    )
+                ]))
+        stream.write(");\n")
+
+        stream.write("\nedges\n(\n);\n")
+
+        stream.write("\npatches\n(\n")
+        for pI in self.patches:
+            stream.write("    %s %s\n    (\n" %(pI.type,pI.name))
+            faces = pI.getFaces()
+            for i in range(0,len(faces),chunkSize):
+                stream.write("".join([
+                                "        (%i %i %i %i)\n" %tuple(fI)
+                                for fI in faces[i:i + chunkSize]
+                                ]))
+            stream.write("    )\n")
+        stream.write(");\n")
+
+        stream.write(
+            "\n// ************************************************************************* //\n"
+            )
 
 class patch:
     """
@@ -231,7 +712,7 @@ class patch:
         return [fI.verticeIds for fI in self.faces]
 
 
-class block:
+class block(object):
     """
     Representation of a block. A block consists of 8 vertices, but can be
     constructed from two as well. If two are provided, they are used as a
@@ -248,41 +729,35 @@ class block:
     :param noNodeAdjustment: Do not adjust the number of nodes, in order to
         achieve a smooth transition (optional)
     :param noGradingAdjustment: (optional)
-
-    All blocks are stored in the :attr:`.list` and are accessable in a global
-    manner, from all block instances. Each instances stores all 8 vertices
-    explicitely, but if the coordinates do already exist, they are marked as
-    being a duplicate. On construction, the faces and edges are generated
-    automatically and the adjoining neighbours are gathered as well.
-    """
-
-    blockCount = -1
-    """
-    Global counter for all generated blocks
-
-    :type: int
-    """
-
-    vertices = []
-    """
-    Stores all existing vertices.
-
-    :type: list
+    :param registry: Registry to add the block to (optional, default is
+        :attr:`block.registry`)
+    :type registry: :class:`meshRegistry`
+
+    All blocks of a :class:`meshRegistry` are stored in its list and are
+    accessable from all of its blocks via :attr:`.list`. The vertices, the
+    nodes, gradings and neighbours of the blocks are kept in the
+    :attr:`storage` of the registry, which the attributes of the block refer
+    to. If the coordinates of a vertex do already
+    exist, the existing vertex is referenced. On construction, the edges are
+    generated automatically and the adjoining neighbours are gathered as well.
     """
 
-    list = []
+    registry = meshRegistry()
     """
-    Stores all existing blocks.
+    Default registry for blocks, that are created without one. Its blocks can
+    only be added to a :class:`blockMesh`, that has been created with it.
 
-    :type: list
+    :type: :class:`meshRegistry`
     """
 
-    edges = []
-    """
-    Stores all existing edges.
-
-    :type: list
-    """
+    storage = registryProperty("storage")
+    tolerance = registryProperty("tolerance")
+    list = registryProperty("blocks")
+    vertexIndex = registryProperty("vertexIndex")
+    edges = registryProperty("edges")
+    edgeIndex = registryProperty("edgeIndex")
+    faceIndex = registryProperty("faceIndex")
+    chains = registryProperty("chains")
 
     def __init__(
                 self,
@@ -307,86 +782,130 @@ class block:
         except KeyError:
             self.verbose = False
 
-        # Increase the global blockCount for the next block
-        self.__class__.blockCount += 1
+        try:
+            self.registry = kwargs['registry']
+        except KeyError:
+            self.registry = block.registry
+
+        # Create from 8 points
+        if isinstance(points,list) and len(points) == 8:
+            if self.verbose:
+                print "Constructing block from 8 points"
+
+        # Create from bounding box
+        elif isinstance(points,list) and len(points) == 2:
+            if self.verbose:
+                print "Constructing block from 2 points"
+            points = boundingBox(points[0],points[1])
 
-        self.__class__.list.append(self)
+        else:
+            raise ValueError("Incorrect numbers of points passed to create a block")
 
-        self.id = self.__class__.blockCount 
+        self.id = self.storage.addBlock(
+                                [self.checkDuplicateVertices(pI) for pI in points]
+                                )
         """
         Stores the id of the current block, which is basically nothing else than
-        a global counter for all existing blocks.
+        a counter for all blocks of the registry.
 
         :type: int
         """
 
-        self.ownVertices = []
+        self.list.append(self)
+
+        self.nodes = nodes
+        self.gradings = gradings
+
+        self.ownEdges = []
+
+        self.generateEdges()
+        self.findNeighbour()
+
+    @property
+    def ownVertices(self):
         """
-        Stores the vertices, that are used by the block
+        The vertices, that are used by the block
 
         :type: list
         """
+        return [vertex.view(self.storage,i) for i in self.storage.blocks[self.id]]
 
-        self.nodes = {0:False, 1: False, 2: False}
-        for i in range(0,3):
-            try:
-                self.nodes[i] = nodes[i]
-            except KeyError:
-                pass
+    @property
+    def faces(self):
+        """
+        The faces of the block
 
-        self.gradings = {0:False, 1: False, 2: False}
-        for i in range(0,3):
-            try:
-                self.gradings[i] = gradings[i]
-            except KeyError:
-                pass
+        :type: list
+        """
+        return [face(self,i) for i in range(0,6)]
 
+    def faceKeys(self):
+        """
+        Returns the keys of all faces of the block (see :attr:`face.key`),
+        without creating the faces.
 
-        self.faces = []
+        :rtype: list
+        """
+        ids = self.storage.blocks[self.id].tolist()
+        return [
+                tuple(sorted([ids[i] for i in fI]))
+                for fI in faceVertices
+                ]
+
+    @property
+    def nodes(self):
         """
-        Stores the faces of the block.
+        Cells in each direction, with 0 if undefined. A dict or list can be
+        assigned.
 
-        :type: list
+        :type: numpy.ndarray
         """
+        return self.storage.nodes[self.id]
 
-        self.ownEdges = []
+    @nodes.setter
+    def nodes(self,values):
+        setRow(self.storage.nodes,self.id,values)
 
-        self.neighbours = {
-                            0: False,
-                            1: False,
-                            2: False,
-                            3: False,
-                            4: False,
-                            5: False
-                            }
+    @property
+    def gradings(self):
         """
-        Stores the ids of the neighbouring blocks.
+        Grading in each direction, with 0 if undefined. A dict or list can be
+        assigned.
 
-        :type: dict
+        :type: numpy.ndarray
         """
+        return self.storage.gradings[self.id]
 
+    @gradings.setter
+    def gradings(self,values):
+        setRow(self.storage.gradings,self.id,values)
 
-        # Create from 8 points
-        if isinstance(points,list) and len(points) == 8:
-            if self.verbose:
-                print "Constructing block from 8 points"
-            for pI in points:
-                self.checkDuplicateVertices(pI)
+    @property
+    def adjusted(self):
+        """
+        Stores for each direction, whether the grading has been set by
+        :meth:`adjustGrading`. These gradings take precedence in
+        :meth:`blockMesh.check`.
 
+        :type: numpy.ndarray
+        """
+        return self.storage.adjusted[self.id]
 
-        # Create from bounding box
-        elif isinstance(points,list) and len(points) == 2:
-            if self.verbose:
-                print "Constructing block from 2 points"
-            for pI in boundingBox(points[0],points[1]):
-                self.checkDuplicateVertices(pI)
+    @property
+    def neighbours(self):
+        """
+        Stores the ids of the neighbouring blocks for each face, with -1 if
+        there is none. A dict can be assigned.
 
-        else:
-            raise ValueError("Incorrect numbers of points passed to create a block")
-            
-        self.generateFaces()
-        self.generateEdges()
-        self.findNeighbour()
+        :type: numpy.ndarray
+        """
+        return self.storage.neighbours[self.id]
+
+    @neighbours.setter
+    def neighbours(self,values):
+        self.storage.neighbours[self.id] = -1
+        for faceI,nbI in values.items():
+            self.storage.neighbours[self.id,faceI] = nbI
 
 
     def __eq__(self,other):
@@ -401,20 +920,40 @@ class block:
     def adjustGrading(self,referenceBlock,dir):
         """
         Adjusts the grading of the current block for a specific direction to
-        generate a smooth transition between the cell sizes.
+        generate a smooth transition between the cell sizes. Returns the
+        conflict, if the block can not be adjusted, see
+        :func:`adjustGradings`.
+
+        :param referenceBlock: The reference block
+        :type referenceBlock: :class:`~block`
+        :param dir: Direction (0,1,2)
+        :type dir: int
+
+        :rtype: list
+        """
+        return adjustGradings([self],[referenceBlock],[dir])
+
+    def gradingTarget(self,referenceBlock,dir):
+        """
+        Returns the face of the current block, that adjoins the reference
+        block, the number of nodes, the average cell size of the reference block
+        and the average edge length of the current block for a specific
+        direction. These are the parameters for the grading of the current
+        block, that results in a smooth transition.
 
         :param referenceBlock: The reference block
         :type referenceBlock: :class:`~block`
         :param dir: Direction (0,1,2)
         :type dir: int
+
+        :rtype: tuple
         """
         neighbour = -1
 
-        for dirI,bI in self.neighbours.iteritems():
-            if not isinstance(bI,bool):
-                if self.list[bI] == referenceBlock:
-                    neighbour = dirI
-                
+        for dirI,bI in enumerate(self.neighbours):
+            if bI == referenceBlock.id:
+                neighbour = dirI
+
         if neighbour == -1:
             raise KeyError("The provided block is not a direct neighbour")
 
@@ -432,40 +971,8 @@ class block:
 
         # Compute the average cell size of the target block
         dXRef = lAverageRef/referenceBlock.nodes[dir]
-        dXOwn = lAverageOwn/self.nodes[dir]
-
-        # Initialise start values
-        rRange = 1.0/arange(0.001,500,0.05)
-        rMin = 0.0
-        r = 0.0
-
-        # Solve for r
-        for rI in rRange:
-            if rMin == min( \
-                            rMin,
-                            self.ownEdges[edgeDir[0]].gradFunction(
-                                    rI,
-                                    self.nodes[dir],
-                                    dXRef,
-                                    lAverageOwn,
-                                    1
-                                )
-                          ):
-                r = rI
-            else:
-                break
-    
-        # If the last node of the edge needs to be adjusted, simply inverse the
-        # grading.
-        if not bool(neighbour%2):
-            r = 1.0/r
-
-        # Update the grading for this block
-        self.gradings[dir] = r
 
-        # Update the all neighbours and their neighbours and keep the grading of
-        # this block constant.
-        self.checkNodes(keepCurrent=True)
+        return neighbour,self.nodes[dir],dXRef,lAverageOwn
 
     def allNeighbours(self,dir):
         """
@@ -477,54 +984,72 @@ class block:
 
         :rtype: list
         """
+        return [bI for bI in self.chain(dir) if bI != self.id]
 
-        # Initialise the access function for the directions
-        dir = [dir*2,dir*2+1]
+    def chain(self,dir):
+        """
+        Returns the ids of all blocks, that are lined up with the current block
+        in a specific direction (0,1,2), including the current block. The ids
+        are ordered from the minimum to the maximum side. The chain is cached
+        for all of its blocks in :attr:`chains`.
 
-        # Stores all neighbours for the particular direction
-        nbFound = []
+        :param dir: Direction to search
+        :type dir: int
 
-        # Search for neighbouring blocks in all directions and store them in one
-        # list. Unfortunately :meth:`getNeighbours` returns ``False`` in a list
-        # and these entries need to be removed.
-        for dirI in dir:
-            nbFound += self.getNeighbours(dirI,self.id)
+        :rtype: list
+        """
+        try:
+            return self.chains[(self.id,dir)]
+        except KeyError:
+            pass
 
-        nb = []
-        # Clean up the list, by removing all ``False`` entries
-        for nbI in nbFound:
-            if nbI:
-                nb.append(nbI)
+        lower = self.getNeighbours(dir*2,self.id)
+        upper = self.getNeighbours(dir*2+1,self.id,exclude=set(lower))
+        line = lower[::-1] + [self.id] + upper
 
-        return nb
+        for bI in line:
+            self.chains[(bI,dir)] = line
+        return line
 
+    def invalidateChain(self,dir):
+        """
+        Discards the cached chain of the current block for a specific
+        direction, for all blocks of the chain.
+
+        :param dir: Direction (0,1,2)
+        :type dir: int
+        """
+        for bI in self.chains.pop((self.id,dir),[]):
+            self.chains.pop((bI,dir),None)
 
-    def getNeighbours(self,dir,blockId):
+    def getNeighbours(self,dir,blockId,exclude=()):
         """
-        Recursively searches all neighbours in one major direction (x,y,z),
-        starting at one block. A list is returned, that contains the block ids
-        for the neighbouring blocks.
+        Searches all neighbours in one face direction (0-5), starting at one
+        block. A list is returned, that contains the block ids for the
+        neighbouring blocks, ordered by their distance. The search stops, if a
+        block is reached for the second time.
 
         :param dir: Direction to be searched
         :type dir: int
         :param blockId: ID of the block to investigate
         :type blockId: int
+        :param exclude: IDs of blocks, that end the search (optional)
+        :type exclude: set
 
         :rtype: list
         """
+        found = []
+        visited = set(exclude)
+        visited.add(blockId)
 
-        # Get the neighbours of the block for the respective direction
-        nNext = self.list[blockId].neighbours[dir]
+        neighbours = self.storage.neighbours[:,dir]
+        nNext = int(neighbours[blockId])
+        while nNext >= 0 and nNext not in visited:
+            found.append(nNext)
+            visited.add(nNext)
+            nNext = int(neighbours[nNext])
 
-        # If there are neighbours for that direction, search them as well. This
-        # is where the recursion starts.
-        if nNext:
-            newID = self.getNeighbours(dir,nNext)
-            if newID:
-                newID.append(nNext)
-                return newID
-        else:
-            return [False]
+        return found
 
 
     def checkNodes(self,keepCurrent=False):
@@ -602,60 +1127,61 @@ class block:
     def findNeighbour(self):
         """
         Finds the neighbouring blocks for the current block and stores their ids
-        in :meth:`neighbours`. The search is pretty stupid and there is severe
-        room for improvements.
+        in :meth:`neighbours`. The faces of the block are looked up in the
+        :attr:`faceIndex` and registered there, if they do not exist yet.
         """
+        for ownFace,kI in enumerate(self.faceKeys()):
+            try:
+                bId,nbFace = self.faceIndex[kI]
+            except KeyError:
+                self.faceIndex[kI] = (self.id,ownFace)
+                continue
+            link(self,ownFace,self.list[bId],nbFace)
 
-        # Check all existing blocks, but not self
-        for bI in self.list:
-            if bI != self:
-
-                # Loop over all faces of the respective block and check if the
-                # current block shares the same face. If so, exchange the
-                # neighboring ids.
-                for fI in bI.faces:
-                    ownFace = 0
-                    for fIOwn in self.faces:
-                        if fI == fIOwn:
-                            self.neighbours[ownFace] = bI.id
-                            bI.neighbours[self.ownToNeighbourId(ownFace)] = self.id
+    def checkDuplicateVertices(self,v):
+        """
+        Checks if certain coordinates v already exist as a vertex and returns
+        its id. Otherwise a new vertex is generated and its id is returned,
+        see :meth:`meshRegistry.addVertex`.
 
-                        ownFace += 1
+        :param v: Coordinates to be checked and added
+        :type v: tuple
 
+        :rtype: int
+        """
+        return self.registry.addVertex(v)
 
-    def checkDuplicateVertices(self,v):
+    def snap(self,v):
         """
-        Checks if certain coordinates v already exist as a vertex. If so,
-        particular vertex is duplicated and the the duplicate property is set to
-        ``True``. This duplicate is appended to the global and local vertex 
-        list for later reference. Otherwise a new vertex is generated and 
-        appended to both lists as well. If the coordinates do exist, the function
-        returns ``True`` otherwise ``False``.
+        Returns the key of the coordinates v in :attr:`vertexIndex`, see
+        :meth:`meshRegistry.snap`.
 
-        :param v: Coordinates to be checked and added
+        :param v: Coordinates
         :type v: tuple
 
-        :rtype: bool
+        :rtype: tuple
         """
-        for vI in self.vertices:
-            if vI == v:
-                vTemp = deepcopy(vI)
-                vTemp.duplicate = True
+        return self.registry.snap(v)
 
-                self.vertices.append(vTemp)
-                self.ownVertices.append(vTemp)
-                return True
+    def findVertex(self,v):
+        """
+        Returns the id of the existing vertex for the coordinates v, or ``None``
+        if there is none, see :meth:`meshRegistry.findVertex`.
 
-        vTemp = vertex(v)
-        self.vertices.append(vTemp)
-        self.ownVertices.append(vTemp)
-        return False
+        :param v: Coordinates
+        :type v: tuple
+
+        :rtype: int
+        """
+        return self.registry.findVertex(v)
 
     def checkDuplicateEdges(self,start,end):
         """
-        Checks if a certain edge does already exist. If so, it is copied and
-        marked as a duplicate. Otherwise it is created. The edges are appended
-        to the current block as well as to the global list of edges.
+        Checks if a certain edge does already exist, regardless of its
+        direction. If so, the existing edge is appended to the current block.
+        Otherwise it is created and appended to the current block as well as to
+        the edges of the registry. If the edge does exist, the function returns
+        ``True`` otherwise ``False``.
 
         :param start: start vertex
         :type start: :class:`vertex`
@@ -664,147 +1190,97 @@ class block:
 
         :rtype: bool
         """
-        for eI in self.edges:
-            if start == eI.start and end == eI.end:
-                eTemp = deepcopy(eI)
-                eTemp.duplicate = True
+        key = (min(start.id,end.id),max(start.id,end.id))
+        try:
+            self.ownEdges.append(self.edgeIndex[key])
+            return True
+        except KeyError:
+            pass
 
-                self.edges.append(eTemp)
-                self.ownEdges.append(eTemp)
-                return True
-        
         eTemp = edge(start,end)
+        eTemp.id = len(self.edges)
         self.edges.append(eTemp)
+        self.edgeIndex[key] = eTemp
         self.ownEdges.append(eTemp)
-
-    def generateFaces(self):
-        """
-        Generates all 6 faces from the vertices of the block and stores them in
-        :meth:`.faces`
-        """
-        # xmin face
-        self.faces.append(face([
-                                self.ownVertices[4],
-                                self.ownVertices[7],
-                                self.ownVertices[3],
-                                self.ownVertices[0]
-                                ]))
-
-        # xmax face
-        self.faces.append(face([
-                                self.ownVertices[6],
-                                self.ownVertices[5],
-                                self.ownVertices[1],
-                                self.ownVertices[2]
-                                ]))
-
-        # ymin face
-        self.faces.append(face([
-                                self.ownVertices[5],
-                                self.ownVertices[4],
-                                self.ownVertices[0],
-                                self.ownVertices[1]
-                                ]))
-
-        # ymax face
-        self.faces.append(face([
-                                self.ownVertices[7],
-                                self.ownVertices[6],
-                                self.ownVertices[2],
-                                self.ownVertices[3]
-                                ]))
-
-        # zmin face
-        self.faces.append(face([
-                                self.ownVertices[3],
-                                self.ownVertices[2],
-                                self.ownVertices[1],
-                                self.ownVertices[0]
-                                ]))
-
-        # zmax face
-        self.faces.append(face([
-                                self.ownVertices[4],
-                                self.ownVertices[5],
-                                self.ownVertices[6],
-                                self.ownVertices[7]
-                                ]))
+        return False
 
     def generateEdges(self):
         """
         Generates all 12 edges from the vertices of the block and stores them in
         :meth:`.edges`
         """
+        ownVertices = self.ownVertices
+
         # Edge 0
         self.checkDuplicateEdges(
-                                self.ownVertices[0],
-                                self.ownVertices[1]
+                                ownVertices[0],
+                                ownVertices[1]
                             )
                                 
         # Edge 1
         self.checkDuplicateEdges(
-                                self.ownVertices[3],
-                                self.ownVertices[2]
+                                ownVertices[3],
+                                ownVertices[2]
                             )
                                 
         # Edge 2
         self.checkDuplicateEdges(
-                                self.ownVertices[7],
-                                self.ownVertices[6]
+                                ownVertices[7],
+                                ownVertices[6]
                             )
                                 
         # Edge 3
         self.checkDuplicateEdges(
-                                self.ownVertices[4],
-                                self.ownVertices[5]
+                                ownVertices[4],
+                                ownVertices[5]
                             )
                                 
         # Edge 4
         self.checkDuplicateEdges(
-                                self.ownVertices[0],
-                                self.ownVertices[3]
+                                ownVertices[0],
+                                ownVertices[3]
                             )
                                 
         # Edge 5
         self.checkDuplicateEdges(
-                                self.ownVertices[1],
-                                self.ownVertices[2]
+                                ownVertices[1],
+                                ownVertices[2]
                             )
                                 
         # Edge 6
         self.checkDuplicateEdges(
-                                self.ownVertices[5],
-                                self.ownVertices[6]
+                                ownVertices[5],
+                                ownVertices[6]
                             )
                                 
         # Edge 7
         self.checkDuplicateEdges(
-                                self.ownVertices[4],
-                                self.ownVertices[7]
+                                ownVertices[4],
+                                ownVertices[7]
                             )
                                 
         # Edge 8
         self.checkDuplicateEdges(
-                                self.ownVertices[0],
-                                self.ownVertices[4]
+                                ownVertices[0],
+                                ownVertices[4]
                             )
                                 
         # Edge 9
         self.checkDuplicateEdges(
-                                self.ownVertices[1],
-                                self.ownVertices[5]
+                                ownVertices[1],
+                                ownVertices[5]
                             )
                                 
         # Edge 10
         self.checkDuplicateEdges(
-                                self.ownVertices[2],
-                                self.ownVertices[6]
+                                ownVertices[2],
+                                ownVertices[6]
                             )
 
         # Edge 11
         self.checkDuplicateEdges(
-                                self.ownVertices[3],
-                                self.ownVertices[7]
+                                ownVertices[3],
+                                ownVertices[7]
                             )
 
 
@@ -821,7 +1297,12 @@ class edge:
     :type type: string
     """
 
-    edgeCount = 0
+    id = 0
+    """
+    Id of the edge within the edges of its :class:`meshRegistry`
+
+    :type: int
+    """
 
     def __init__(
                 self,
@@ -830,9 +1311,6 @@ class edge:
                 type='line',
                 *args
                 ):
-        self.id = self.__class__.edgeCount
-        self.__class__.edgeCount += 1
-
         self.start = start
         """
         Stores the start vertex
@@ -903,40 +1381,260 @@ class edge:
         return self.lmbd(r,n,i=i)-dX/l
 
 
-class face:
+class face(object):
     """
-    Represents a face of a block, not a patch.
+    Represents a face of a block, not a patch. The face is a view onto the
+    block.
 
-    :param vertices: Vertices the face consists of
-    :type vertices: list
+    :param block: Block the face belongs to
+    :type block: :class:`block`
+    :param number: Number of the face of the block (0-5)
+    :type number: int
     """
 
-    def __init__(self,vertices):
-        self.vertices = vertices
+    def __init__(self,block,number):
+        self.block = block
+        self.number = number
+
+    @property
+    def verticeIds(self):
+        """
+        Ids of the vertices of the face
+
+        :type: list
+        """
+        ids = self.block.storage.blocks[self.block.id].tolist()
+        return [ids[i] for i in faceVertices[self.number]]
+
+    @property
+    def vertices(self):
+        """
+        Vertices of the face
+
+        :type: list
+        """
+        return [vertex.view(self.block.storage,i) for i in self.verticeIds]
+
+    @property
+    def key(self):
+        """
+        Sorted vertex ids, which identify the face regardless of its
+        orientation.
+
+        :type: tuple
+        """
+        return tuple(sorted(self.verticeIds))
 
-        self.boundaryFace = True
+    @property
+    def boundaryFace(self):
+        """
+        Whether the face is not shared with another block
+
+        :type: bool
+        """
+        return bool(self.block.storage.boundary[self.block.id,self.number])
 
-        self.verticeIds = [vI.id for vI in self.vertices]
+    @boundaryFace.setter
+    def boundaryFace(self,value):
+        self.block.storage.boundary[self.block.id,self.number] = value
 
     def outputString(self):
         """
         Generates the string, that can be used in the `blockMeshDict`
         """
-        return "(%i %i %i %i)" %(self.vertices[0].id,
-                                self.vertices[1].id,
-                                self.vertices[2].id,
-                                self.vertices[3].id)
+        return "(%i %i %i %i)" %tuple(self.verticeIds)
 
     def __repr__(self):
         return self.outputString()
 
     def __eq__(self,other):
-        if [True for vI in self.vertices if vI.id in other.verticeIds].count(True) == 4:
-            return True
-        else:
-            return False
+        return self.key == other.key
 
 
+def equivalenceClasses(count,pairs):
+    """
+    Groups the elements 0..count-1 into classes, so that both elements of each
+    pair belong to the same class, with a union-find. Returns the class of each
+    element, which is the smallest element of the class.
+
+    :param count: Number of elements
+    :type count: int
+    :param pairs: Pairs of connected elements
+    :type pairs: list
+
+    :rtype: list
+    """
+    parent = range(count)
+
+    def find(element):
+        while parent[element] != element:
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    for aI,bI in pairs:
+        rootA = find(aI)
+        rootB = find(bI)
+        if rootA < rootB:
+            parent[rootB] = rootA
+        elif rootB < rootA:
+            parent[rootA] = rootB
+
+    return [find(eI) for eI in range(count)]
+
+def link(block0,face0,block1,face1):
+    """
+    Stores two blocks as neighbours of each other, as they share a face. The
+    shared face is not a boundary face anymore.
+
+    :param block0: First block
+    :type block0: :class:`block`
+    :param face0: Number of the shared face of the first block
+    :type face0: int
+    :param block1: Second block
+    :type block1: :class:`block`
+    :param face1: Number of the shared face of the second block
+    :type face1: int
+    """
+    block0.neighbours[face0] = block1.id
+    block1.neighbours[face1] = block0.id
+    block0.invalidateChain(face0//2)
+    block1.invalidateChain(face1//2)
+    block0.storage.boundary[block0.id,face0] = False
+    block1.storage.boundary[block1.id,face1] = False
+
+def adjustGradings(blocks,referenceBlocks,dirs):
+    """
+    Adjusts the gradings of several blocks at once, each with respect to its
+    reference block and direction, as done by :meth:`block.adjustGrading`. The
+    expansion ratios of all blocks are solved in one vectorised call of
+    :func:`expansionRatio`.
+
+    A block, whose edges are not longer than the cells of its reference
+    block, can not be adjusted and keeps its grading. The other blocks are
+    adjusted nevertheless. Returns the conflicts in the same form as
+    :attr:`blockMesh.conflicts`, i.e. ``("gradings", dir, [id, referenceId])``
+    for each block, that has not been adjusted.
+
+    :param blocks: Blocks to adjust
+    :type blocks: list
+    :param referenceBlocks: The reference block for each block
+    :type referenceBlocks: list
+    :param dirs: Direction (0,1,2) for each block
+    :type dirs: list
+
+    :rtype: list
+    """
+    targets = [
+                bI.gradingTarget(refI,dirI)
+                for bI,refI,dirI in zip(blocks,referenceBlocks,dirs)
+                ]
+    r = expansionRatio(
+                    [tI[1] for tI in targets],
+                    [tI[2] for tI in targets],
+                    [tI[3] for tI in targets]
+                    )
+
+    conflicts = []
+    for bI,refI,dirI,tI,rI in zip(blocks,referenceBlocks,dirs,targets,r):
+        if isnan(rI):
+            conflicts.append(("gradings",dirI,[bI.id,refI.id]))
+            continue
+
+        # If the last node of the edge needs to be adjusted, simply inverse the
+        # grading.
+        if not bool(tI[0]%2):
+            rI = 1.0/rI
+
+        # Update the grading for this block
+        bI.gradings[dirI] = float(rI)
+        bI.adjusted[dirI] = True
+
+    # Update the all neighbours and their neighbours and keep the grading of
+    # the adjusted blocks constant.
+    for bI in blocks:
+        bI.checkNodes(keepCurrent=True)
+
+    return conflicts
+
+def expansionRatio(n,dX,l,tolerance=1e-12,maxRatio=1e6):
+    """
+    Solves for the grading :math:`r` of an edge with length :math:`l` and
+    :math:`n` nodes, so that the first cell has the size :math:`\\Delta x`,
+    i.e. for the root of :meth:`edge.gradFunction`.
+
+    .. math::
+
+        \\lambda(r,1) - \\frac{\\Delta x}{l} = 0
+
+    As :math:`\\lambda` is monotonic in :math:`\\log r`, the root is
+    bracketed by :math:`1/r_{max}` and :math:`r_{max}` and found with the
+    Illinois variant of the regula falsi. All arguments can be arrays, which are
+    solved at once. Gradings beyond the bracket are limited to it. If the cell
+    size is not between 0 and the length of the edge, there is no grading and
+    NaN is returned for that edge.
+
+    :param n: Number of nodes on the edge
+    :type n: int or numpy.ndarray
+    :param dX: Size of the first cell
+    :type dX: float or numpy.ndarray
+    :param l: Length of the edge
+    :type l: float or numpy.ndarray
+    :param tolerance: Relative tolerance of the cell size (optional)
+    :type tolerance: float
+    :param maxRatio: Largest grading, that is considered (optional)
+    :type maxRatio: float
+
+    :rtype: float or numpy.ndarray
+    """
+    n,target = broadcast_arrays(
+                            asarray(n,dtype=float),
+                            asarray(dX,dtype=float)/asarray(l,dtype=float)
+                            )
+    invalid = ~((target > 0) & (target < 1))
+    target = where(invalid,0.5,target)
+
+    # The grading of an edge with a single cell is arbitrary
+    single = n <= 1
+    n = where(single,2.0,n)
+
+    def f(x):
+        a = x/(1.0-n)
+        with errstate(invalid='ignore'):
+            return where(a == 0, 1.0/n, expm1(a)/expm1(n*a)) - target
+
+    a = full_like(n,-log(maxRatio))
+    b = -a
+    fa = f(a)
+    fb = f(b)
+
+    # Targets outside of the bracket are limited to its bounds
+    limited = (fa >= 0) | (fb <= 0)
+    bound = where(fa >= 0,a,b)
+    done = limited.copy()
+
+    for iteration in range(100):
+        if done.all():
+            break
+        with errstate(invalid='ignore',divide='ignore'):
+            c = where(done,b,b - fb*(b - a)/(fb - fa))
+        fc = f(c)
+
+        # Illinois step: If the new point does not change the side of the
+        # bracket, the function value of the retained end point is halved.
+        swap = fc*fb < 0
+        a = where(swap,b,a)
+        fa = where(swap,fb,0.5*fa)
+        b = c
+        fb = fc
+        done = done | (absolute(fc) <= tolerance*target)
+
+    r = where(single,1.0,exp(where(limited,bound,b)))
+    r = where(invalid,nan,r)
+    if r.ndim:
+        return r
+    return float(r)
+
 def boundingBox(minV,maxV):
     """
     Creates all vertices for a bounding box and returns them as a list
@@ -961,57 +1659,101 @@ def boundingBox(minV,maxV):
             ]
 
 
+def coordinateProperty(i):
+    """
+    Returns a property, that gives access to a single coordinate of a
+    :class:`vertex` in its storage.
+
+    :param i: Direction (0,1,2)
+    :type i: int
+
+    :rtype: property
+    """
+    def get(self):
+        return float(self.storage.points[self.id,i])
+    def set(self,value):
+        self.storage.points[self.id,i] = value
+    return property(get,set)
+
 class vertex(Vector):
     """
     Representation of a vertex, inherits
-    :class:`PyFoam.Basics.DataStructures.Vector`, all each instance of itself in
-    an internal list. By doing that, no extra class for the vertex list handling
-    must be implemented and duplicate vertices can be handled in a fairly
-    straight forward manner.
+    :class:`PyFoam.Basics.DataStructures.Vector`. The coordinates are not
+    stored in the instance, but in the :class:`meshStorage` of a
+    :class:`meshRegistry`, so that each vertex is only a view onto its row.
+    Constructing a vertex registers it like the vertices of the blocks, see
+    :meth:`meshRegistry.addVertex`, so that it refers to an existing vertex
+    with the same coordinates. :meth:`view` refers to an existing vertex by
+    its id.
+
+    :param p: Coordinates
+    :type p: tuple
+    :param registry: Registry of the vertex (optional, default is
+        :attr:`block.registry`)
+    :type registry: :class:`meshRegistry`
     """
 
-    vertexCount = -1
+    id = 0
     """
-    Global counter for all existing vertices
+    Id of the vertex
 
     :type: int
     """
 
-    id = 0
+    duplicate = False
     """
-    Id of the vertex
+    Vertices are never duplicated, but referenced by their id.
 
-    :type: int
+    :type: bool
     """
 
-    def __init__(self, p):
+    def __init__(self, p, registry=None):
+        if registry is None:
+            registry = block.registry
+
+        self.storage = registry.storage
+        self.id = registry.addVertex(p)
+
+    @classmethod
+    def view(cls,storage,id):
         """
-        :param x: x coordinate
-        :type x: float
-        :param y: y coordinate
-        :type y: float
-        :param z: z coordinate
-        :type z: float
+        Returns a vertex, that refers to an existing vertex of a storage.
+
+        :param storage: Storage of the vertex
+        :type storage: :class:`meshStorage`
+        :param id: Id of the vertex
+        :type id: int
+
+        :rtype: :class:`vertex`
         """
-        # Ensure floats for the coordinates
-        x = float(p[0])
-        y = float(p[1])
-        z = float(p[2])
+        out = cls.__new__(cls)
+        out.storage = storage
+        out.id = int(id)
+        return out
 
-        # Construct parent vector class
-        Vector.__init__(self,x,y,z)
+    x = coordinateProperty(0)
+    y = coordinateProperty(1)
+    z = coordinateProperty(2)
 
-        # Register the coordinates
-        self.x = x
-        self.y = y
-        self.z = z
+    @property
+    def vals(self):
+        """
+        Coordinates of the vertex, as used by
+        :class:`PyFoam.Basics.DataStructures.Vector`
 
-        self.duplicate = False
+        :type: list
+        """
+        return [float(cI) for cI in self.storage.points[self.id]]
+
+    @vals.setter
+    def vals(self,values):
+        self.storage.points[self.id] = values
 
-        self.id = self.__class__.vertexCount + 1
-        self.__class__.vertexCount += 1
+    def __getitem__(self,key):
+        return self.vals[key]
 
-            
+    def __setitem__(self,key,value):
+        self.storage.points[self.id,key] = value
 
     def __repr__(self):
         return "%i\t(%f %f %f)" %(self.id,self.x,self.y,self.z)
@@ -1024,4 +1766,3 @@ class vertex(Vector):
             if self.x == other.x and self.y == other.y and self.z == other.z:
                 return True
         return False
-
@@ -15,18 +15,33 @@
 #Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
 
 
-from math import log,sqrt
-
-from numpy import arange
-from numpy import log10
+from numpy import absolute,asarray,errstate,interp,linspace,log,log10,sqrt,where
 
 from OF import Constants
 from OF.Basic import FlowProperties
 """
 This package contains various skin friction curves, that are used in naval
 architecture. All definitions should be based on the Reynoldsnumber as well as
-on the velocity and the Froude number.
+on the velocity and the Froude number. All lines accept numpy arrays as well and
+are evaluated element wise in that case.
+"""
+
+schoenherrTolerance = 1e-12
+"""
+Relative tolerance of the Newton iterations for the Schoenherr line.
+
+:type: float
+"""
+
+schoenherrRange = (3.0, 11.0, 8001)
 """
+Range of :math:`\\log_{10} Re` and number of points of the interpolation
+table for the Schoenherr line.
+
+:type: tuple
+"""
+
+_schoenherrTable = None
 
 def ittc57(**kwargs):
     """
@@ -44,15 +59,15 @@ def ittc57(**kwargs):
     derived accordingly.
 
     :param Re: Reynoldsnumber
-    :type Re: float
+    :type Re: float or numpy.ndarray
     :param Fr: Froudenumber
-    :type Fr: float
+    :type Fr: float or numpy.ndarray
     :param u: Velocity :math:`[\\frac{m}{s}]`
-    :type u: float
+    :type u: float or numpy.ndarray
     :param L: Reference length :math:`[m]`
-    :type L: float
+    :type L: float or numpy.ndarray
 
-    :rtype: float
+    :rtype: float or numpy.ndarray
 
     :Author: Jens Hoepken <jhoepken@gmail.com>
     """
@@ -61,10 +76,7 @@ def ittc57(**kwargs):
     else:
         u,Fr,Re = FlowProperties.uFrRe(**kwargs)
 
-    try:
-        return 0.075/((log(Re,10)-2)**2)
-    except TypeError:
-        return 0.075/((log10(Re)-2)**2)
+    return 0.075/((log10(Re)-2)**2)
 
 def huges(**kwargs):
     """
@@ -83,15 +95,15 @@ def huges(**kwargs):
     derived accordingly.
 
     :param Re: Reynoldsnumber
-    :type Re: float
+    :type Re: float or numpy.ndarray
     :param Fr: Froudenumber
-    :type Fr: float
+    :type Fr: float or numpy.ndarray
     :param u: Velocity :math:`[\\frac{m}{s}]`
-    :type u: float
+    :type u: float or numpy.ndarray
     :param L: Reference length :math:`[m]`
-    :type L: float
+    :type L: float or numpy.ndarray
 
-    :rtype: float
+    :rtype: float or numpy.ndarray
 
     :Author: Jens Hoepken <jhoepken@gmail.com>
     """
@@ -100,8 +112,8 @@ def huges(**kwargs):
         Re = kwargs['Re']
     else:
         u,Fr,Re = FlowProperties.uFrRe(**kwargs)
-        
-    return 0.066/((log(Re,10)-2.03)**2)
+
+    return 0.066/((log10(Re)-2.03)**2)
 
 def schoenherr(**kwargs):
     """
@@ -112,35 +124,92 @@ def schoenherr(**kwargs):
 
         \\frac{0.242}{\sqrt{C_F}} = \log_{10} (C_F Re)
 
+    The implicit equation is solved with Newton iterations for
+    :math:`x = 1/\\sqrt{C_F}`. Arrays of Reynoldsnumbers are solved at once.
+    If ``interpolate`` is set, the coefficient is interpolated from a table,
+    that is computed on the first call, which is considerably faster for
+    repeated calls. Reynoldsnumbers outside of :data:`schoenherrRange` are
+    always solved directly. The line is only defined for :math:`Re > 1`, for
+    all other Reynoldsnumbers 0 is returned.
+
     It is not necessary to hand a Reynoldsnumber to the function. If a velocity
     or Froudenumber and a reference length is passed, the Reynoldsnumber is
     derived accordingly.
 
     :param Re: Reynoldsnumber
-    :type Re: float
+    :type Re: float or numpy.ndarray
     :param Fr: Froudenumber
-    :type Fr: float
+    :type Fr: float or numpy.ndarray
     :param u: Velocity :math:`[\\frac{m}{s}]`
-    :type u: float
+    :type u: float or numpy.ndarray
     :param L: Reference length :math:`[m]`
-    :type L: float
+    :type L: float or numpy.ndarray
+    :param interpolate: Interpolate from a table (optional, default=False)
+    :type interpolate: bool
 
-    :rtype: float
+    :rtype: float or numpy.ndarray
 
     :Author: Jens Hoepken <jhoepken@gmail.com>
     """
+    interpolate = kwargs.pop('interpolate', False)
     if 'Re' in kwargs.iterkeys():
         Re = kwargs['Re']
     else:
         u,Fr,Re = FlowProperties.uFrRe(**kwargs)
 
-    iteration = 100.0
+    if not interpolate:
+        return _solveSchoenherr(Re)
+
+    global _schoenherrTable
+    if _schoenherrTable is None:
+        logRe = linspace(*schoenherrRange)
+        _schoenherrTable = (logRe, 1.0/sqrt(_solveSchoenherr(10**logRe)))
+
+    Re = asarray(Re, dtype=float)
+    with errstate(divide='ignore', invalid='ignore'):
+        logRe = log10(Re)
+        outside = ~((logRe >= schoenherrRange[0]) & (logRe <= schoenherrRange[1]))
+    if not logRe.ndim:
+        if outside:
+            return _solveSchoenherr(Re)
+        return float(1.0/interp(logRe, *_schoenherrTable)**2)
+
+    Cf = 1.0/interp(logRe, *_schoenherrTable)**2
+    if outside.any():
+        Cf[outside] = _solveSchoenherr(Re[outside])
+    return Cf
+
+def _solveSchoenherr(Re):
+    """
+    Solves the Schoenherr line for the given Reynoldsnumbers with Newton
+    iterations and returns the friction coefficients. Reynoldsnumbers, for
+    which the line is not defined (:math:`Re \leq 1`), are masked and get a
+    coefficient of 0, as with the former grid search.
 
-    for CdI in arange(0.001,0.007,0.00001):
-        if abs(0.242/sqrt(CdI) - log(CdI*Re,10)) < iteration:
-            iteration = 0.242/sqrt(CdI) - log(CdI*Re,10)
-            Cd = CdI
-        else:
-            return Cd
-    return 0.0
+    :param Re: Reynoldsnumber
+    :type Re: float or numpy.ndarray
 
+    :rtype: float or numpy.ndarray
+    """
+    Re = asarray(Re, dtype=float)
+    scalar = not Re.ndim
+    valid = Re > 1
+    logRe = log10(where(valid, Re, 10.0))
+
+    # f(x) = 0.242*x + 2*log10(x) - log10(Re) with x = 1/sqrt(C_F) is
+    # increasing and concave. Starting left of the root, which follows from
+    # x < log10(Re)/0.242, the iterations converge monotonically. For small
+    # Reynoldsnumbers, where this start is not positive, 10**(log10(Re)/2 - 1)
+    # is left of the root instead.
+    x = (logRe - 2*log10(logRe/0.242))/0.242
+    x = where(x > 0, x, 10**(0.5*logRe - 1))
+    for iteration in range(100):
+        dx = (0.242*x + 2*log10(x) - logRe)/(0.242 + 2/(x*log(10)))
+        x = x - dx
+        if not (absolute(dx) > schoenherrTolerance*x).any():
+            break
+
+    Cf = where(valid, 1.0/x**2, 0.0)
+    if scalar:
+        return float(Cf)
+    return Cf
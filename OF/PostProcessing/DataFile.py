@@ -15,8 +15,51 @@
 #Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
 
 
+import hashlib
+import json
 import numpy
 import re
+import warnings
+
+from os import listdir,makedirs,remove,stat
+from os.path import basename,dirname,getsize,isdir,isfile,join
+
+from OF import Settings
+from OF.Basic import FieldFile
+
+numberRe = re.compile(Settings.floatPattern.encode())
+"""
+Compiled regular expression for a number: integer, float, double with support
+for scientific notation.
+"""
+
+commentRe = re.compile(br"^[ \t]*(?://|%|#)[^\n]*", re.M)
+"""
+Compiled regular expression, that matches all lines that start with a comment
+symbol (``//``, ``%`` or ``#``).
+"""
+
+blockSize = 1 << 22
+"""
+Number of bytes, that are read and tokenised at once.
+
+:type: int
+"""
+
+cacheSuffix = ".cache"
+"""
+Suffix of the directory next to the data file, that stores the binary cache.
+
+:type: string
+"""
+
+hashSize = 1 << 16
+"""
+Number of bytes at the beginning and at the end of the cached part of a data
+file, that are hashed to validate the cache.
+
+:type: int
+"""
 
 class dataFile():
     """
@@ -36,60 +79,776 @@ class dataFile():
 
     _fileData = None
     """
-    Content of the file, read via :meth:`readlines()`
+    Parsed content of the file. Each row represents one line of the file.
+    Unused, if the data is stored column by column.
+
+    :type: numpy.array
+    """
+
+    _columns = None
+    """
+    Parsed content of the file, if the data is stored column by column. Each
+    column is a contiguous array, that is either held in memory or mapped from
+    the binary cache.
 
     :type: list
     """
 
-    def __init__(self, path):
+    _columnMajor = False
+    """
+    States whether the data is stored column by column in :attr:`_columns`.
+
+    :type: bool
+    """
+
+    _rows = 0
+    """
+    Number of valid rows in :attr:`_fileData` or :attr:`_columns`, which are
+    preallocated and might therefore be longer.
+
+    :type: int
+    """
+
+    _offset = 0
+    """
+    Number of bytes of the file, that have been parsed as complete lines.
+
+    :type: int
+    """
+
+    _partial = False
+    """
+    States whether the last row of the data has been parsed from a
+    line without a trailing newline, which might still be written to.
+
+    :type: bool
+    """
+
+    _rowIndex = None
+    """
+    Selects the rows, that form a strictly increasing time line. ``None`` if
+    it has not been computed for the current data yet.
+
+    :type: slice/numpy.array
+    """
+
+    _cache = False
+    """
+    States whether the parsed data is stored in a binary cache next to the
+    data file.
+
+    :type: bool
+    """
+
+    _cachedRows = None
+    """
+    Number of rows, that are stored in the binary cache. ``None`` if the cache
+    needs to be written from scratch.
+
+    :type: int
+    """
+
+    def __init__(self, path, cache=False, columnMajor=False):
         """
         :param path: Path to the data file
         :type path: string
+        :param cache: Use a binary cache next to the data file (optional,
+            default=``False``)
+        :type cache: bool
+        :param columnMajor: Store each column in a contiguous array, which is
+            returned by :meth:`__getitem__` without copying. In combination
+            with the cache, the columns are memory mapped. (optional,
+            default=``False``)
+        :type columnMajor: bool
         """
 
         self._path = path
+        self._cache = cache
+        self._columnMajor = columnMajor
 
-        # Read the data file via readlines and store the content
-        self._fileData = list(open(path,"r").read().splitlines())
-        self.parse()
+        if cache and self._loadCache():
+            # Parse everything, that has been appended since the cache was
+            # written.
+            self._read()
+        else:
+            self.parse()
+
+        if cache:
+            self._updateCache()
 
     def __getitem__(self,key):
+        if self._columnMajor:
+            columns = self._columns[key]
+            if not isinstance(columns, list):
+                return columns[:self._rows]
+            elif not columns:
+                return numpy.empty((self._rows,0))
+            return numpy.column_stack([cI[:self._rows] for cI in columns])
+
         # Get the column data from the _fileData array.
-        return self._fileData[:,key]
+        return self._fileData[:self._rows,key]
+
+    def getPath(self):
+        """
+        Returns the path to the data file
+
+        :rtype: string
+        """
+        return self._path
+
+    def getPaths(self):
+        """
+        Returns the paths of all files, the data has been read from.
+
+        :rtype: list
+        """
+        return [self._path]
+
+    def width(self):
+        """
+        Returns the number of columns
+
+        :rtype: int
+        """
+        if self._columnMajor:
+            return len(self._columns)
+        return self._fileData.shape[1]
+
+    def parse(self):
+        """
+        Parses the whole file from the beginning and discards all data, that
+        has been read before.
+        """
+        self._reset()
+        self._read()
+
+    def _reset(self):
+        """
+        Discards all data, that has been read before.
+        """
+        self._fileData = numpy.empty((0,0))
+        self._columns = []
+        self._rows = 0
+        self._offset = 0
+        self._partial = False
+        self._cachedRows = None
+        self._rowIndex = None
+
+    def refresh(self):
+        """
+        Parses only the lines, that have been appended to the file since it
+        has been read the last time. This is meant for files of running cases.
+        If the file has shrunk, it is parsed from the beginning.
+
+        Returns the number of new rows.
+
+        :rtype: int
+        """
+        if getsize(self._path) < self._offset:
+            self.parse()
+            return self._rows
+
+        rows = self._rows
+
+        # An unterminated last line is read again, as it might have been
+        # incomplete.
+        if self._partial:
+            self._rows -= 1
+            self._partial = False
+
+        self._read()
+        self._rowIndex = None
+
+        if self._cache:
+            self._updateCache()
+
+        return self._rows - rows
+
+    def rows(self):
+        """
+        Returns the selection of rows, that form a strictly increasing time
+        line. If the time line is not monotonic, e.g. if a case has been
+        restarted from an earlier time and kept writing to the same file, the
+        rows written later take precedence. The selection is computed once and
+        reused until the file is read again.
+
+        The result is a slice, if the time line is already monotonic. Applying
+        it to a column returns a view.
+
+        :rtype: slice/numpy.array
+        """
+        if self._rowIndex is None:
+            index = monotonic(self[0])
+            if index is None:
+                self._rowIndex = slice(0, self._rows)
+            else:
+                self._rowIndex = index
+        return self._rowIndex
+
+    def times(self):
+        """
+        Returns the strictly increasing time line, selected by :meth:`rows`.
+
+        :rtype: numpy.array
+        """
+        return self[0][self.rows()]
+
+    def window(self, start=0.0, end=1.0, absolute=False):
+        """
+        Returns the selection of rows, whose times lie inside a time window.
+        The window is found by a binary search on :meth:`times`.
+
+        :param start: Start of the window
+        :type start: float
+        :param end: End of the window
+        :type end: float
+        :param absolute: States whether start and end are absolute times or
+            relative to the last time.
+        :type absolute: bool
+
+        :rtype: slice/numpy.array
+        """
+        rows = self.rows()
+        inside = window(self.times(), start, end, absolute)
+        if isinstance(rows, slice):
+            return inside
+        return rows[inside]
+
+    def _cacheDir(self):
+        """
+        Returns the path of the cache directory.
+
+        :rtype: string
+        """
+        return self._path + cacheSuffix
+
+    def _cacheFile(self, name):
+        """
+        Returns the path of a file inside the cache directory.
+
+        :param name: Name of the file
+        :type name: string
+
+        :rtype: string
+        """
+        return join(self._cacheDir(), name)
+
+    def _signature(self):
+        """
+        Describes all files, that have been read completely before the file at
+        :attr:`_path`. The cache is only valid, if the signature did not
+        change.
+
+        :rtype: list
+        """
+        return []
+
+    def _loadCache(self):
+        """
+        Loads the parsed data from the binary cache, which stores each column
+        as a raw ``float64`` file and the state of the data file in
+        ``meta.json``. The cache is valid, if the hash of the beginning and end
+        of the cached part of the data file did not change. If size or
+        modification time of the data file changed as well, the cache is still
+        valid, as long as the data file has only been appended to.
+
+        Returns ``True`` if the cache was valid and has been loaded.
+
+        :rtype: bool
+        """
+        try:
+            with open(self._cacheFile("meta.json"), "r") as f:
+                meta = json.load(f)
+
+            status = stat(self._path)
+            if status.st_size < meta["offset"] or \
+                meta["segments"] != self._signature():
+                return False
+            if sampleHash(self._path, meta["offset"]) != meta["hash"]:
+                return False
+
+            columns = []
+            for i in range(meta["columns"]):
+                path = self._cacheFile("%i.f8" %i)
+                if getsize(path) != 8*meta["rows"]:
+                    return False
+                columns.append(numpy.memmap(
+                                            path,
+                                            dtype="<f8",
+                                            mode="r",
+                                            shape=(meta["rows"],)
+                                            ))
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return False
+
+        if self._columnMajor:
+            self._columns = columns
+        else:
+            self._fileData = numpy.column_stack(columns)
+        self._rows = meta["rows"]
+        self._offset = meta["offset"]
+        self._partial = False
+        self._cachedRows = meta["rows"]
+        return True
+
+    def _updateCache(self):
+        """
+        Appends all complete rows, that are not yet stored in the binary cache,
+        to the column files. The cache is rebuilt, if the number of columns
+        changed. Rewritten files are replaced atomically, see
+        :func:`~OF.Basic.FieldFile.atomicFile`, so that processes refreshing
+        the same cache do not interfere. Errors are ignored, as the cache is
+        optional.
+        """
+        rows = self._rows - int(self._partial)
+        columns = self.width()
+        if not rows or rows == self._cachedRows:
+            return
+
+        try:
+            with open(self._cacheFile("meta.json"), "r") as f:
+                cached = json.load(f)
+        except (IOError, OSError, ValueError):
+            cached = None
+
+        try:
+            if not isdir(self._cacheDir()):
+                makedirs(self._cacheDir())
+
+            append = cached and self._cachedRows is not None and \
+                cached.get("rows") == self._cachedRows and \
+                cached.get("columns") == columns
+
+            # Invalidate the cache, before the columns are rewritten.
+            if not append and cached is not None:
+                remove(self._cacheFile("meta.json"))
+
+            for i in range(columns):
+                path = self._cacheFile("%i.f8" %i)
+                if append:
+                    with open(path, "ab") as f:
+                        numpy.ascontiguousarray(
+                                            self[i][self._cachedRows:rows],
+                                            dtype="<f8"
+                                            ).tofile(f)
+                else:
+                    # Column files are replaced instead of being truncated, as
+                    # they might still be memory mapped.
+                    with FieldFile.atomicFile(path) as f:
+                        numpy.ascontiguousarray(
+                                            self[i][:rows],
+                                            dtype="<f8"
+                                            ).tofile(f)
+
+            status = stat(self._path)
+            meta = {
+                    "rows": rows,
+                    "columns": columns,
+                    "offset": self._offset,
+                    "size": status.st_size,
+                    "mtime": status.st_mtime,
+                    "hash": sampleHash(self._path, self._offset),
+                    "segments": self._signature()
+                    }
+            with FieldFile.atomicFile(self._cacheFile("meta.json")) as f:
+                json.dump(meta, f)
+        except (IOError, OSError):
+            self._cachedRows = None
+            return
+
+        self._cachedRows = rows
+
+    def _read(self, size=None):
+        """
+        Reads the file from :attr:`_offset` on in blocks of :data:`blockSize`
+        bytes and tokenises each block with :func:`parseBlock`. The results are
+        appended to a preallocated array, whose size is estimated from the
+        first block. Lines are never split between two blocks.
+
+        :param size: Expected number of bytes to read, which defaults to the
+            remainder of the file (optional)
+        :type size: int
+        """
+        if size is None:
+            size = getsize(self._path) - self._offset
+        rest = b""
+
+        with open(self._path, "rb") as data:
+            data.seek(self._offset)
+            while True:
+                chunk = data.read(blockSize)
+                if not chunk:
+                    break
+                chunk = rest + chunk
+
+                # Only complete lines are parsed, the remainder is prepended
+                # to the next block.
+                end = chunk.rfind(b"\n") + 1
+                rest = chunk[end:]
+                self._offset += end
+                block = parseBlock(chunk[:end])
+
+                # Extrapolate the number of lines in the file from the first
+                # block, to preallocate the storage.
+                if not self._rows:
+                    self._append(block, int(1.05*len(block)*size/max(end, 1)))
+                else:
+                    self._append(block)
+
+        # The last line of a file is not necessarily terminated by a newline.
+        # It is kept, if it is complete with respect to the number of columns,
+        # but the offset is not moved beyond it.
+        block = parseBlock(rest)
+        if len(block) and (not self._rows or block.shape[1] == self.width()):
+            self._append(block)
+            self._partial = True
+
+    def _append(self, block, capacity=0):
+        """
+        Copies a parsed block into :attr:`_fileData`. The storage is
+        preallocated on the first call with ``capacity`` rows and grown by a
+        factor of two if necessary. Blocks with more columns than the storage
+        widen it and missing entries are filled with ``nan``.
+
+        :param block: Parsed data
+        :type block: numpy.array
+        :param capacity: Expected total number of rows
+        :type capacity: int
+        """
+        rows, cols = block.shape
+        if not rows:
+            return
+        elif self._columnMajor:
+            self._appendColumns(block, capacity)
+            return
+
+        if not self._rows and capacity > len(self._fileData):
+            self._fileData = numpy.empty((max(rows, capacity), cols))
+
+        capacity, width = self._fileData.shape
+        if self._rows + rows > capacity or cols > width:
+            grown = numpy.empty((
+                            max(capacity, 2*(self._rows + rows)),
+                            max(width, cols)
+                            ))
+            grown[:self._rows,:width] = self._fileData[:self._rows]
+            grown[:self._rows,width:] = numpy.nan
+            self._fileData = grown
+            capacity, width = grown.shape
+
+        self._fileData[self._rows:self._rows + rows,:cols] = block
+        self._fileData[self._rows:self._rows + rows,cols:] = numpy.nan
+        self._rows += rows
+
+    def _appendColumns(self, block, capacity=0):
+        """
+        Same as :meth:`_append`, but copies each column of the block into the
+        respective array of :attr:`_columns`. Read-only columns, that are
+        mapped from the cache, are copied into memory before being extended.
+
+        :param block: Parsed data
+        :type block: numpy.array
+        :param capacity: Expected total number of rows
+        :type capacity: int
+        """
+        rows, cols = block.shape
+
+        # Add missing columns
+        while len(self._columns) < cols:
+            column = numpy.empty(max(rows, capacity, self._rows))
+            column[:self._rows] = numpy.nan
+            self._columns.append(column)
+
+        for i, column in enumerate(self._columns):
+            if self._rows + rows > len(column) or not column.flags.writeable:
+                grown = numpy.empty(max(len(column), 2*(self._rows + rows)))
+                grown[:self._rows] = column[:self._rows]
+                self._columns[i] = column = grown
+
+            if i < cols:
+                column[self._rows:self._rows + rows] = block[:,i]
+            else:
+                column[self._rows:self._rows + rows] = numpy.nan
+        self._rows += rows
+
+class multiDataFile(dataFile):
+    """
+    Representation of a data file, that has been written in multiple segments,
+    as function objects start a new directory named after the start time
+    whenever a case is restarted, e.g. ``forces/0/forces.dat`` and
+    ``forces/1200/forces.dat``. The segments are read in the order of their
+    start times into one array and all rows of a segment, that are later than
+    the start time of the following segment, are discarded.
+
+    Only the last segment is followed by :meth:`refresh`. The binary cache is
+    stored next to the start time directories.
+    """
+
+    _segments = []
+    """
+    Paths to all segments, sorted by their start time
+
+    :type: list
+    """
+
+    _startTimes = []
+    """
+    Start time of each segment
+
+    :type: list
+    """
+
+    def __init__(self, paths, cache=False, columnMajor=False):
+        """
+        :param paths: Paths to the segments, sorted by their start time. The
+            name of the parent directory of each segment is its start time.
+        :type paths: list
+        :param cache: Use a binary cache (optional, default=``False``)
+        :type cache: bool
+        :param columnMajor: Store each column in a contiguous array (optional,
+            default=``False``)
+        :type columnMajor: bool
+        """
+        self._segments = list(paths)
+        self._startTimes = [float(basename(dirname(pI))) for pI in paths]
+
+        dataFile.__init__(
+                        self,
+                        self._segments[-1],
+                        cache=cache,
+                        columnMajor=columnMajor
+                        )
+
+    def getPaths(self):
+        """
+        Returns the paths of all segments.
+
+        :rtype: list
+        """
+        return list(self._segments)
 
     def parse(self):
         """
-        Uses regular expressions to extract a list of numbers from the lines in
-        the file. Skips all lines that start with a comment symbol.
+        Parses all segments from the beginning and discards all data, that has
+        been read before. The segments are appended to the same storage, which
+        is preallocated for the total size of all segments.
+        """
+        self._reset()
+        size = sum(getsize(pI) for pI in self._segments)
+
+        for path, nextStart in zip(self._segments[:-1], self._startTimes[1:]):
+            self._path = path
+            self._offset = 0
+            self._read(size)
+            self._trim(nextStart)
+            self._partial = False
+
+        self._path = self._segments[-1]
+        self._offset = 0
+        self._read(size)
+
+    def _trim(self, time):
+        """
+        Discards the rows at the end, that are later than a certain time.
+
+        :param time: Last time to keep
+        :type time: float
+        """
+        if not self._rows:
+            return
+        kept = numpy.flatnonzero(self[0] <= time)
+        if kept.size:
+            self._rows = int(kept[-1]) + 1
+        else:
+            self._rows = 0
+
+    def _cacheDir(self):
+        """
+        Returns the path of the cache directory, which is located next to the
+        start time directories.
+
+        :rtype: string
+        """
+        return join(
+                    dirname(dirname(self._segments[-1])),
+                    basename(self._segments[-1]) + cacheSuffix
+                    )
+
+    def _signature(self):
+        """
+        Describes all segments but the last one by their path, size and
+        modification time.
+
+        :rtype: list
         """
-        parsedData = []
+        out = []
+        for pI in self._segments[:-1]:
+            status = stat(pI)
+            out.append([pI, status.st_size, status.st_mtime])
+        return out
+
+def segments(directory, name):
+    """
+    Finds all segments of a data file, that is written by a function object
+    into start time directories, and returns their paths sorted by the start
+    time.
+
+    :param directory: Output directory of the function object, e.g.
+        ``forces``
+    :type directory: string
+    :param name: Name of the data file, e.g. ``forces.dat``
+    :type name: string
+
+    :rtype: list
+    """
+    out = []
+    for dI in listdir(directory):
+        try:
+            startTime = float(dI)
+        except ValueError:
+            continue
+        path = join(directory, dI, name)
+        if isfile(path):
+            out.append((startTime, path))
+    return [pI for tI, pI in sorted(out)]
+
+def sampleHash(path, size):
+    """
+    Returns the SHA1 hash of the first and last :data:`hashSize` bytes of the
+    first ``size`` bytes of a file.
+
+    :param path: Path to the file
+    :type path: string
+    :param size: Number of bytes to consider
+    :type size: int
+
+    :rtype: string
+    """
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        sha.update(f.read(min(size, hashSize)))
+        f.seek(max(size - hashSize, 0))
+        sha.update(f.read(min(size, hashSize)))
+    return sha.hexdigest()
+
+def parseBlock(text):
+    """
+    Tokenises a block of lines at once and returns the numbers as an array with
+    one row per data line. Comment lines and empty lines are skipped and the
+    parentheses of vector entries are ignored. Ragged rows are padded with
+    ``nan``.
+
+    The numbers are converted by :func:`numpy.fromstring` and the number of
+    tokens per line is counted with array operations on the raw bytes. If the
+    block contains anything but numbers, the lines are parsed one by one with
+    :data:`numberRe`.
+
+    :param text: Raw content of the lines
+    :type text: bytes
+
+    :rtype: numpy.array
+    """
+    # Comments are usually only found in the header, therefore the expensive
+    # substitution is skipped for all other blocks.
+    if b"#" in text or b"//" in text or b"%" in text:
+        text = commentRe.sub(b"", text)
+    text = text.replace(b"(", b" ").replace(b")", b" ").replace(b",", b" ")
+
+    # Every non whitespace character, that follows a whitespace character or
+    # the beginning of the block, starts a new token.
+    raw = numpy.frombuffer(text, dtype=numpy.uint8)
+    isSpace = (raw == ord(" ")) | ((raw >= ord("\t")) & (raw <= ord("\r")))
+    starts = numpy.flatnonzero(~isSpace[1:] & isSpace[:-1]) + 1
+    if raw.size and not isSpace[0]:
+        starts = numpy.concatenate(([0], starts))
 
-        # Regular expression for a number: integer, float, double with support
-        # for scientific notation.
-        numberRe = re.compile(r"[+-]? *(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?")
-        # Possible line comments.
-        lineComments = ("//", "%","#") 
+    # Assign each token to the line it is located in and count the tokens
+    # of each line
+    newLines = numpy.flatnonzero(raw == ord("\n"))
+    line = numpy.searchsorted(newLines, starts)
+    counts = numpy.bincount(line)
+    counts = counts[counts > 0]
 
-        for line in self._fileData:
-            # Remove the whitespace on the left of the line.
-            line = str(line).lstrip()
-            if not line.startswith(lineComments):
-                # re.findall returns a list of strings that are to be mapped
-                # into float values by the "map" builtin function.
-                # The result will be a list of numbers that are added to the
-                # data list.
-                parsedData.append(list(map(lambda number: float(number),
-                    re.findall(numberRe,str(line)))));
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            values = numpy.fromstring(text, sep=" ")
+        except ValueError:
+            values = numpy.empty(0)
 
-        # Overwrite the file raw ASCII data with the numpy.array object that
-        # is a result of the data mining. 
-        self._fileData = numpy.array(parsedData)
+    if values.size != starts.size:
+        return parseLines(text.splitlines())
+
+    if not counts.size:
+        return numpy.empty((0,0))
+    elif (counts == counts[0]).all():
+        return values.reshape(counts.size, counts[0])
+
+    out = numpy.empty((counts.size, counts.max()))
+    out.fill(numpy.nan)
+    row = numpy.repeat(numpy.arange(counts.size), counts)
+    col = numpy.arange(values.size) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    out[row,col] = values
+    return out
+
+def parseLines(lines):
+    """
+    Uses regular expressions to extract a list of numbers from each line.
+    This is much slower than :func:`parseBlock` and only used for lines, that
+    contain text besides the numbers.
+
+    :param lines: Lines without comments
+    :type lines: list
+
+    :rtype: numpy.array
+    """
+    parsedData = []
+
+    for line in lines:
+        # re.findall returns a list of strings that are to be mapped into
+        # float values.
+        numbers = [float(number.replace(b" ", b""))
+                    for number in numberRe.findall(line)]
+        if numbers:
+            parsedData.append(numbers)
+
+    if not parsedData:
+        return numpy.empty((0,0))
+
+    out = numpy.empty((len(parsedData), max(len(pI) for pI in parsedData)))
+    out.fill(numpy.nan)
+    for i, pI in enumerate(parsedData):
+        out[i,:len(pI)] = pI
+    return out
+
+def monotonic(times):
+    """
+    Returns the indices of the times, that form a strictly increasing time
+    line, if later times supersede all earlier times that are equal or
+    larger. If the times are already strictly increasing, ``None`` is
+    returned.
+
+    :param times: All time values
+    :type times: numpy.array
+
+    :rtype: numpy.array
+    """
+    times = numpy.asarray(times)
+    if times.size < 2 or (times[1:] > times[:-1]).all():
+        return None
+
+    # A time is kept, if it is smaller than all times written after it.
+    later = numpy.minimum.accumulate(times[::-1])[::-1]
+    keep = numpy.ones(times.size, dtype=bool)
+    keep[:-1] = times[:-1] < later[1:]
+    return numpy.flatnonzero(keep)
 
 def element(times,target,absolute=False):
     """
     Finds and returns the array element number where the time is approximately
     equal to the target. If no such time is found, the id of the last element is
-    returned.
+    returned. The element is found by a binary search, therefore the times have
+    to be sorted in ascending order.
 
     :param times: All time values
     :type times: numpy.array
@@ -103,10 +862,28 @@ def element(times,target,absolute=False):
         targetTime = target*times[-1]
     else:
         targetTime = target
-    i = 0
-    for tI in times:
-        if tI >= targetTime:
-            return i
-        i += 1
-    return i
+    return int(numpy.searchsorted(times, targetTime))
+
+def window(times,start=0.0,end=1.0,absolute=False):
+    """
+    Returns a slice of all elements, whose times lie within a time window.
+    The borders are found by :func:`element`, therefore the times have to be
+    sorted in ascending order.
+
+    :param times: All time values
+    :type times: numpy.array
+    :param start: Start of the window
+    :type start: float
+    :param end: End of the window
+    :type end: float
+    :param absolute: States whether start and end are absolute times or
+        relative to the last time.
+    :type absolute: bool
+
+    :rtype: slice
+    """
+    return slice(
+                element(times,start,absolute),
+                element(times,end,absolute)
+                )
 
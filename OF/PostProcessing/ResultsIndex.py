@@ -0,0 +1,352 @@
+#Copyright (C) 2013 Jens Hoepken
+
+#This program is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 2 of the License, or
+#(at your option) any later version.
+
+#This program is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#GNU General Public License for more details.
+
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+
+import hashlib
+import sqlite3
+
+from os import listdir,stat
+from os.path import join,split
+
+from numpy import average,nan,std
+
+from OF.Basic import Case
+
+"""
+This package contains a persistent index of the results of cases, stored in an
+SQLite database. For each case it holds the flow properties and the mean and
+standard deviation of the resistances in the requested time windows. A case is
+only loaded again, if its forces, its velocity or the parameters it is loaded
+with have changed. Cases, that fail to load, are not indexed, but loaded again
+on every lookup, as the cause of the failure need not be part of the
+fingerprint.
+"""
+
+schema = """
+CREATE TABLE IF NOT EXISTS cases (
+    name TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    Re REAL,
+    Fr REAL,
+    uInf REAL
+);
+CREATE TABLE IF NOT EXISTS statistics (
+    name TEXT NOT NULL,
+    quantity TEXT NOT NULL,
+    start REAL NOT NULL,
+    "end" REAL NOT NULL,
+    absolute INTEGER NOT NULL,
+    mean REAL,
+    std REAL,
+    PRIMARY KEY (name, quantity, start, "end", absolute)
+);
+"""
+"""
+Tables of the index
+
+:type: string
+"""
+
+quantities = ('CF','CT','RF','RT')
+"""
+Resistances, whose statistics are stored
+
+:type: tuple
+"""
+
+def toFloat(value):
+    """
+    Converts a value read from the index back to a float. SQLite stores NaN
+    as ``NULL``, which is read as ``None``.
+
+    :param value: Value of a ``REAL`` column
+    :type value: float
+
+    :rtype: float
+    """
+    if value is None:
+        return nan
+    return value
+
+def inputPaths(name):
+    """
+    Returns the paths of the files, that the results of a case are calculated
+    from: the segments of the forces and the velocity in the first time
+    directory.
+
+    :param name: Name of the solution directory
+    :type name: string
+
+    :rtype: list
+    """
+    times = []
+    for dI in listdir(name):
+        try:
+            times.append((float(dI), dI))
+        except ValueError:
+            pass
+
+    out = Case.forcesPaths(name)
+    if times:
+        out.append(join(name, min(times)[1], 'U'))
+    return out
+
+def fingerprint(name, kwargs):
+    """
+    Returns a hash of the size and modification time of the input files of a
+    case (see :func:`inputPaths`) and of the parameters, that it is loaded
+    with.
+
+    :param name: Name of the solution directory
+    :type name: string
+    :param kwargs: Keyword arguments for :class:`~OF.Basic.Case.case`
+    :type kwargs: dict
+
+    :rtype: string
+    """
+    sha = hashlib.sha1(repr(sorted(kwargs.items())).encode())
+    try:
+        paths = inputPaths(name)
+    except OSError:
+        paths = []
+    for pI in paths:
+        try:
+            status = stat(pI)
+        except OSError:
+            continue
+        sha.update(("%s %i %r\n" %(pI, status.st_size, status.st_mtime)).encode())
+    return sha.hexdigest()
+
+class caseStatistics():
+    """
+    Flow properties and statistics of the resistances of a case in one time
+    window, as returned by :meth:`resultsIndex.statistics`.
+
+    :param name: Name of the solution directory
+    :type name: string
+    """
+
+    def __init__(self, name, Re=0.0, Fr=0.0, uInf=0.0, error=None):
+        self.name = name
+        self.shortCaseName = split(name)[1]
+        self.Re = Re
+        self.Fr = Fr
+        self.uInf = uInf
+
+        self.error = error
+        """
+        Message of the error, that occurred while loading the case. ``None``
+        if the case has been loaded successfully.
+
+        :type: string
+        """
+
+        self.mean = {}
+        """
+        Mean of each resistance in the time window
+
+        :type: dict
+        """
+
+        self.std = {}
+        """
+        Standard deviation of each resistance in the time window
+
+        :type: dict
+        """
+
+class resultsIndex():
+    """
+    Persistent index of the results of cases. The index is created, if it does
+    not exist yet.
+
+    :param path: Path to the database file, or ``:memory:`` for an index, that
+        is not stored
+    :type path: string
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(schema)
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self.connection.close()
+
+    def lookup(self, name, fingerprint, start, end, absolute):
+        """
+        Returns the statistics of a case from the index, or ``None`` if the
+        case is not indexed with the given fingerprint or lacks the statistics
+        of the time window. Values, that are NaN, are returned as NaN.
+
+        :param name: Name of the solution directory
+        :type name: string
+        :param fingerprint: Current fingerprint of the case
+        :type fingerprint: string
+        :param start: Start of the window
+        :type start: float
+        :param end: End of the window
+        :type end: float
+        :param absolute: States whether start and end are absolute times
+        :type absolute: bool
+
+        :rtype: :class:`caseStatistics`
+        """
+        row = self.connection.execute(
+                    "SELECT Re, Fr, uInf FROM cases "
+                    "WHERE name = ? AND fingerprint = ?",
+                    (name, fingerprint)
+                    ).fetchone()
+        if row is None:
+            return None
+
+        out = caseStatistics(name, *[toFloat(vI) for vI in row])
+        for quantity, mean, deviation in self.connection.execute(
+                    "SELECT quantity, mean, std FROM statistics "
+                    "WHERE name = ? AND start = ? AND \"end\" = ? AND absolute = ?",
+                    (name, start, end, int(absolute))
+                    ):
+            out.mean[quantity] = toFloat(mean)
+            out.std[quantity] = toFloat(deviation)
+        if len(out.mean) < len(quantities):
+            return None
+        return out
+
+    def store(self, result, fingerprint, start, end, absolute):
+        """
+        Calculates the statistics of a loaded case in a time window and stores
+        them together with its flow properties. Statistics of an earlier
+        state of the case are discarded. A case, that has failed to load, is
+        removed from the index, so that it is loaded again on the next lookup.
+
+        :param result: Loaded case
+        :type result: :class:`~OF.Basic.Case.caseResult`
+        :param fingerprint: Fingerprint of the case
+        :type fingerprint: string
+        :param start: Start of the window
+        :type start: float
+        :param end: End of the window
+        :type end: float
+        :param absolute: States whether start and end are absolute times
+        :type absolute: bool
+
+        :rtype: :class:`caseStatistics`
+        """
+        out = caseStatistics(
+                            result.name,
+                            result.Re,
+                            result.Fr,
+                            result.uInf,
+                            result.error
+                            )
+
+        if out.error is not None:
+            self.connection.execute(
+                    "DELETE FROM statistics WHERE name = ?",
+                    (result.name,)
+                    )
+            self.connection.execute(
+                    "DELETE FROM cases WHERE name = ?",
+                    (result.name,)
+                    )
+            return out
+
+        window = result.window(start, end, absolute)
+        for qI in quantities:
+            out.mean[qI] = float(average(result.resistances[qI][window]))
+            out.std[qI] = float(std(result.resistances[qI][window]))
+
+        old = self.connection.execute(
+                    "SELECT fingerprint FROM cases WHERE name = ?",
+                    (result.name,)
+                    ).fetchone()
+        if old is None or old[0] != fingerprint:
+            self.connection.execute(
+                    "DELETE FROM statistics WHERE name = ?",
+                    (result.name,)
+                    )
+        self.connection.execute(
+                    "INSERT OR REPLACE INTO cases (name, fingerprint, Re, Fr, uInf) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (result.name, fingerprint, out.Re, out.Fr, out.uInf)
+                    )
+        self.connection.executemany(
+                    "INSERT OR REPLACE INTO statistics VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                    (result.name, qI, start, end, int(absolute), out.mean[qI], out.std[qI])
+                    for qI in out.mean
+                    ]
+                    )
+        return out
+
+    def statistics(
+                self,
+                names,
+                start=0.5,
+                end=1.0,
+                absolute=False,
+                jobs=1,
+                threads=False,
+                **kwargs
+                ):
+        """
+        Returns the statistics of multiple cases in a time window, in the same
+        order as the names. Only the cases, that are not indexed yet or whose
+        fingerprint (see :func:`fingerprint`) has changed, are loaded via
+        :func:`~OF.Basic.Case.loadCases`. Their results are added to the
+        index.
+
+        :param names: Names of the solution directories
+        :type names: list
+        :param start: Start of the window
+        :type start: float
+        :param end: End of the window
+        :type end: float
+        :param absolute: States whether start and end are absolute times or
+            relative to the last time.
+        :type absolute: bool
+        :param jobs: Number of concurrent workers for loading (optional,
+            default=1)
+        :type jobs: int
+        :param threads: Use threads instead of processes (optional,
+            default=``False``)
+        :type threads: bool
+        :param kwargs: Keyword arguments, that are passed to
+            :class:`~OF.Basic.Case.case`
+
+        :rtype: list
+        """
+        fingerprints = [fingerprint(nI, kwargs) for nI in names]
+        out = [
+            self.lookup(nI, fI, start, end, absolute)
+            for nI, fI in zip(names, fingerprints)
+            ]
+
+        stale = [i for i, oI in enumerate(out) if oI is None]
+        if stale:
+            results = Case.loadCases(
+                                    [names[i] for i in stale],
+                                    jobs=jobs,
+                                    threads=threads,
+                                    **kwargs
+                                    )
+            with self.connection:
+                for i, rI in zip(stale, results):
+                    out[i] = self.store(rI, fingerprints[i], start, end, absolute)
+        return out
@@ -34,3 +34,34 @@ Regexp pattern to match a float
 
 :type: string
 """
+
+cacheDataFiles = False
+"""
+Store the parsed data files of the cases in a binary cache next to them, which
+is reused as long as the data files are only appended to. As this writes into
+the case directories, it is off by default and enabled by the ``--with-cache``
+option of the plotting scripts.
+
+:type: bool
+"""
+
+resultsIndex = ".resultsIndex.sqlite"
+"""
+Name of the file in the working directory, that stores the index of the
+results of the cases, see :mod:`OF.PostProcessing.ResultsIndex`.
+
+:type: string
+"""
+
+sharedCloneItems = (
+                "constant/polyMesh",
+                "constant/triSurface",
+                "runCluster"
+                )
+"""
+Paths relative to the case, that are not modified in the clones of a case and
+can therefore be linked instead of copied, see
+:meth:`OF.Basic.Case.case.cloneCase`.
+
+:type: tuple
+"""
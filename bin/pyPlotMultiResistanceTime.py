@@ -108,6 +108,15 @@ def main():
                     default='CF',
                     help="Sets the data to be plotted. (default=CF)"
                     )
+    parser.add_option(
+                    "-j", "--jobs",
+                    action="store",
+                    dest="jobs",
+                    type="int",
+                    default=1,
+                    help="Number of cases, that are loaded concurrently. "
+                        "(default=1)"
+                    )
 
     group = OptionGroup(parser,"Flag Options")
     group.add_option(
@@ -122,6 +131,19 @@ def main():
                     dest="withoutAverage",
                     help="Do not calculate the average of the data"
                     )
+    group.add_option(
+                    "--with-threads",
+                    action="store_true",
+                    dest="withThreads",
+                    help="Load the cases in threads instead of processes"
+                    )
+    group.add_option(
+                    "--with-cache",
+                    action="store_true",
+                    dest="withCache",
+                    help="Store the parsed forces in a binary cache next to the "
+                        "data files of the cases, which speeds up later runs"
+                    )
     parser.add_option_group(group)
 
     group = OptionGroup(parser,"Statistics Options")
@@ -172,6 +194,9 @@ def main():
     if len(args) != 2:
         parser.error("wrong number of arguments")
 
+    if options.withCache:
+        Settings.cacheDataFiles = True
+
     # Get the reference area and reference lengths from the command line
     # parameters. U needs to be evaluated, as either a string containg "False"
     # is passed or a string with a 3D list in it.
@@ -181,7 +206,6 @@ def main():
     ############################ 
     # Variable initialisations #
     ############################ 
-    startAtElement = 0
     cases = []
     longestDataSet = -1
     i = 0
@@ -199,25 +223,24 @@ def main():
     else:
         caseFolders = options.cases
 
-    # Gather all cases
-    for cI in caseFolders:
-        cases.append(
-                    Case.case(
-                            path.join(getcwd(),cI),
+    # Gather all cases. The force coefficients are calculated while loading,
+    # as the area and a reference length have to be specified. Cases that
+    # fail to load are skipped.
+    for cI in Case.loadCases(
+                            [path.join(getcwd(),cI) for cI in caseFolders],
+                            jobs=options.jobs,
+                            threads=options.withThreads,
                             archive=None,
                             paraviewLink=False,
                             inletPatch=options.inletPatch,
                             L=L,
                             A=area,
                             direction=options.direction
-                            )  
-                    )
-        # Calculation of force coefficients has to be called explicitely, as the
-        # area and a reference length have to be specified. Furtheron it is not
-        # essential that forces are present.
-        cases[-1].calculateCoeffs()
-
-
+                            ):
+        if cI.error:
+            sys.stderr.write("Skipping case %s: %s\n" %(cI.name,cI.error))
+            continue
+        cases.append(cI)
 
         # Figure out which data set is the longest
         if len(cases[i].t) >= len(cases[longestDataSet].t):
@@ -248,29 +271,19 @@ def main():
     Re = []
     ReNumbers = len(list(set([cI.Re for cI in cases])))
     for cI in cases:
-        startAtElement = DataFile.element(
-                                        cI.t,
-                                        options.startAtTime,
-                                        True
-                                        )
-        endAtElement = DataFile.element(
-                                        cI.t,
-                                        options.endAtTime,
-                                        True
-                                        )
+        plotWindow = cI.window(
+                            options.startAtTime,
+                            options.endAtTime,
+                            True
+                            )
         # The average of CF needs to be calculated anyway, as it is needed for
         # the ittc deviation calculation.
-        aveStart = DataFile.element(
-                                    cI.t,
-                                    options.averageStart,
-                                    options.withAbsolute
-                                    )
-        aveEnd = DataFile.element(
-                                    cI.t,
-                                    options.averageEnd,
-                                    options.withAbsolute
-                                    )
-        ave = average(cI.resistances[options.dataToPlot][aveStart:aveEnd])
+        aveWindow = cI.window(
+                            options.averageStart,
+                            options.averageEnd,
+                            options.withAbsolute
+                            )
+        ave = average(cI.resistances[options.dataToPlot][aveWindow])
         if not options.withoutAverage:
             label = "%s (%.2e)" %(cI.shortCaseName,ave)
         else:
@@ -278,8 +291,8 @@ def main():
 
         allPlots.append(
             ax1.plot(
-                    cI.t[startAtElement:endAtElement],
-                    cI.resistances[options.dataToPlot][startAtElement:endAtElement],
+                    cI.t[plotWindow],
+                    cI.resistances[options.dataToPlot][plotWindow],
                     '-',
                     label=label
             )
@@ -290,17 +303,14 @@ def main():
         # line with the same color. Then the relative deviation between CF and
         # ITTC is annotated.
         if not options.withoutIttc and options.dataToPlot == 'CF':
-            ittcStart = DataFile.element(
-                                        cI.t[startAtElement:endAtElement],
+            ittcWindow = DataFile.window(
+                                        cI.t[plotWindow],
                                         options.ittcStart,
-                                        options.withAbsolute
-                                        )
-            ittcEnd = DataFile.element(
-                                        #cI.t,
-                                        cI.t[startAtElement:endAtElement],
                                         options.ittcEnd,
                                         options.withAbsolute
                                         )
+            ittcStart = ittcWindow.start
+            ittcEnd = ittcWindow.stop
             ittc57 = ones(len(cI.t))*SkinFriction.ittc57(Re=cI.Re)
             ax1.fill_between(
                             cI.t[ittcStart:ittcEnd],
@@ -313,8 +323,8 @@ def main():
                 label='ITTC\'57 (%.2e)' %(ittc57[0])
                 allPlots.append(
                     ax1.plot(
-                            cases[longestDataSet].t[startAtElement:endAtElement],
-                            ittc57[startAtElement:endAtElement],
+                            cases[longestDataSet].t[plotWindow],
+                            ittc57[plotWindow],
                             '--',
                             color=allPlots[-1][0].get_color(),
                             label=label
@@ -342,13 +352,8 @@ def main():
     if not options.withoutIttc and options.dataToPlot == 'CF':
         ittc57 = ones(dataLengths[longestDataSet])*\
                 SkinFriction.ittc57(Re=cases[-1].Re)
-        startAtElement = DataFile.element(
-                            cases[longestDataSet].t,
+        plotWindow = cases[longestDataSet].window(
                             options.startAtTime,
-                            True
-                        )
-        endAtElement = DataFile.element(
-                            cases[longestDataSet].t,
                             options.endAtTime,
                             True
                         )
@@ -356,8 +361,8 @@ def main():
             label='ITTC\'57 (%.2e)' %(ittc57[0])
             allPlots.append(
                 ax1.plot(
-                        cases[longestDataSet].t[startAtElement:endAtElement],
-                        ittc57[startAtElement:endAtElement],
+                        cases[longestDataSet].t[plotWindow],
+                        ittc57[plotWindow],
                         '--',
                         color='black',
                         label=label
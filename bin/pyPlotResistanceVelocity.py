@@ -29,11 +29,11 @@ from re import compile,findall
 
 import matplotlib.pyplot as plt 
 import matplotlib as mpl
-from numpy import abs,mean,average,array,lexsort,linspace,std
+from numpy import abs,mean,array,lexsort,linspace
 
 from OF import Settings
-from OF.PostProcessing import DataFile
-from OF.Basic import Case, Utilities, FlowProperties
+from OF.PostProcessing import ResultsIndex
+from OF.Basic import Utilities, FlowProperties
 from OF.NavalHydro import SkinFriction, Resistance
 
 mpl.rc('lines', linewidth=1, color='r')
@@ -90,6 +90,15 @@ def main():
                     default='CF',
                     help="Which data to show on the y-axis. (default=CF)"
                     )
+    parser.add_option(
+                    "-j", "--jobs",
+                    action="store",
+                    dest="jobs",
+                    type="int",
+                    default=1,
+                    help="Number of cases, that are loaded concurrently. "
+                        "(default=1)"
+                    )
 
     group = OptionGroup(parser,"Flag Options")
     group.add_option(
@@ -104,6 +113,27 @@ def main():
                     dest="withoutErrorbars",
                     help="Do not print the error bars for the averaging"
                     )
+    group.add_option(
+                    "--with-threads",
+                    action="store_true",
+                    dest="withThreads",
+                    help="Load the cases in threads instead of processes"
+                    )
+    group.add_option(
+                    "--with-cache",
+                    action="store_true",
+                    dest="withCache",
+                    help="Store the parsed forces in a binary cache next to the "
+                        "data files of the cases, which speeds up later runs"
+                    )
+    group.add_option(
+                    "--without-index",
+                    action="store_true",
+                    dest="withoutIndex",
+                    help="Load all cases, instead of taking the results of "
+                        "unchanged cases from the results index in the current "
+                        "working directory"
+                    )
     parser.add_option_group(group)
 
     group = OptionGroup(parser,"Statistics Options")
@@ -138,6 +168,9 @@ def main():
     if len(args) != 2:
         parser.error("wrong number of arguments")
 
+    if options.withCache:
+        Settings.cacheDataFiles = True
+
     # Get the reference area and reference lengths from the command line
     # parameters. U needs to be evaluated, as either a string containg "False"
     # is passed or a string with a 3D list in it.
@@ -161,27 +194,42 @@ def main():
         dataSetNames.append(thisSet)
         thisSet = []
 
-    # Gather all cases
-    for sI in dataSetNames:
-        casesOfThisSet = []
-        for cI in sI:
-            casesOfThisSet.append(
-                    Case.case(
-                            path.join(getcwd(),cI),
+    # Gather all cases of all data sets at once, so that they can be loaded
+    # concurrently. The statistics of cases, that have not changed since the
+    # last run, are taken from the results index. All others are loaded and
+    # their force coefficients are calculated, as the area and a reference
+    # length have to be specified. Cases that fail to load are skipped.
+    if options.withoutIndex:
+        index = ResultsIndex.resultsIndex(":memory:")
+    else:
+        index = ResultsIndex.resultsIndex(
+                                    path.join(getcwd(),Settings.resultsIndex)
+                                    )
+    results = index.statistics(
+                            [path.join(getcwd(),cI) for sI in dataSetNames
+                                                    for cI in sI],
+                            start=options.averageStart,
+                            end=options.averageEnd,
+                            absolute=bool(options.withAbsolute),
+                            jobs=options.jobs,
+                            threads=options.withThreads,
                             archive=None,
                             paraviewLink=False,
                             inletPatch=options.inletPatch,
                             L=L,
                             A=area,
                             direction=options.direction
-                            )  
-                    )
-            # Calculation of force coefficients has to be called explicitely, as the
-            # area and a reference length have to be specified. Furtheron it is not
-            # essential that forces are present.
-            casesOfThisSet[-1].calculateCoeffs()
-        dataSets.append(casesOfThisSet)
+                            )
+    index.close()
+    for sI in dataSetNames:
         casesOfThisSet = []
+        for cI in results[:len(sI)]:
+            if cI.error:
+                sys.stderr.write("Skipping case %s: %s\n" %(cI.name,cI.error))
+            else:
+                casesOfThisSet.append(cI)
+        results = results[len(sI):]
+        dataSets.append(casesOfThisSet)
 
     if options.xDataToPlot == 'v':
         unitX = 'm/s'
@@ -214,17 +262,7 @@ def main():
     uInf = [1e15,0]
     for sI in dataSets:
         for cI in sI:
-            aveStart = DataFile.element(
-                                        cI.t,
-                                        options.averageStart,
-                                        options.withAbsolute
-                                        )
-            aveEnd = DataFile.element(
-                                        cI.t,
-                                        options.averageEnd,
-                                        options.withAbsolute
-                                        )
-            ave = average(cI.resistances[options.yDataToPlot][aveStart:aveEnd])
+            ave = cI.mean[options.yDataToPlot]
 
             # Update velocities
             Re[0] = min(Re[0],cI.Re)
@@ -239,7 +277,7 @@ def main():
                         cI.Re,
                         cI.uInf,
                         ave,
-                        std(cI.resistances[options.yDataToPlot][aveStart:aveEnd])
+                        cI.std[options.yDataToPlot]
                     ]
             thisSetToPlot.append(tmpList)
 
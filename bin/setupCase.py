@@ -19,14 +19,126 @@
 
 from os import getcwd,path,makedirs
 from optparse import OptionParser,OptionGroup
+from multiprocessing import Pool
+from itertools import imap,izip
 import math
+import sys
 from numpy import linspace,array
 
 from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
-from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
 from PyFoam.Basics.DataStructures import Vector
 
-from OF.Basic import Case, Turbulence, Utilities
+from OF.Basic import Case, FieldFile, Turbulence, Utilities
+
+template = None
+"""
+Template case of the current process, see :func:`initTemplate`
+"""
+
+fieldTemplates = {}
+"""
+Templates of the field files of the template case by the name of the field,
+see :func:`initTemplate`
+"""
+
+def initTemplate(name):
+    """
+    Opens the template case, that is cloned by :func:`setupCase`, and scans its
+    field files of the velocity and the turbulence quantities. This is done
+    once per process, so that the field files of the cases can be rendered
+    from the templates without parsing them again.
+
+    :param name: Path to the template case
+    :type name: string
+    """
+    global template
+    template = Case.case(
+                            name,
+                            archive=None,
+                            paraviewLink=False
+                            )
+    template.addToClone("runCluster")
+    template.addToClone("customRegexp")
+
+    fieldTemplates.clear()
+    for fieldI in ("U","k","epsilon","omega"):
+        if path.exists(path.join(name,"0",fieldI)):
+            fieldTemplates[fieldI] = FieldFile.fieldTemplate(
+                                                path.join(name,"0",fieldI)
+                                                )
+
+def velocityReplacements(uTemplate,U):
+    """
+    Returns the replacements for the velocity field template, that set the
+    internal field and the inlet values of the outer patches to a velocity,
+    together with a message for each updated patch.
+
+    :param uTemplate: Template of the velocity field
+    :type uTemplate: :class:`OF.Basic.FieldFile.fieldTemplate`
+    :param U: Velocity
+    :type U: Vector
+
+    :rtype: tuple
+    """
+    value = "uniform (%.15g %.15g %.15g)" %(U[0],U[1],U[2])
+    start,end,v = uTemplate.find((),"internalField")
+    replacements = [(start,end,value)]
+    messages = []
+
+    for b in ["XMIN","XMAX","YMIN","YMAX","ZMIN", "ZMAX"]:
+        patchType = uTemplate.find(("boundaryField",b),"type")
+        if patchType is None:
+            raise KeyError(b)
+
+        setPatch = False
+        for inlet in ['value', 'inletValue', 'tangentialVelocity']:
+            entry = uTemplate.find(("boundaryField",b),inlet)
+            if entry is not None:
+                replacements.append((entry[0],entry[1],value))
+                setPatch = True
+
+        if setPatch:
+            messages.append("\tSetting patch: %s type %s" %(b, patchType[2]))
+    return replacements,messages
+
+def setupCase(task):
+    """
+    Clones the template case for one velocity and drift angle and sets the
+    boundary conditions. Errors are not raised, but returned together with the
+    messages, so that the other cases of a sweep are not affected.
+
+    :param task: Name of the new case, velocity, drift angle, characteristic
+        length, whether to skip the turbulence fields and the link mode for
+        :meth:`OF.Basic.Case.case.cloneCase`
+    :type task: tuple
+
+    :rtype: tuple
+    """
+    name, vI, beta, dh, withoutTurbulence, linkMode = task
+    messages = []
+    try:
+        # Clone the template case
+        case = template.cloneCase(name,linkMode=linkMode)
+
+        # Rotate the velocity vector around z axis, according to the specified
+        # drift angle.
+        U = Vector(
+                vI*math.cos(math.radians(beta)),
+                vI*math.sin(math.radians(beta)),
+                0
+                )
+
+        # Render the velocity boundary condition(s) from the template with the
+        # respective values, that have been calculated previously.
+        replacements,messages = velocityReplacements(fieldTemplates["U"],U)
+        fieldTemplates["U"].write(path.join(case.name,"0","U"),replacements)
+
+        if not withoutTurbulence:
+            messages.append("\tFixing turbulence Dh = %s" %dh)
+            case.writeTurbulence(dh, Utilities.mag(U), templates=fieldTemplates)
+    except Exception as e:
+        return messages, "%s: %s" %(e.__class__.__name__, e)
+    return messages, None
 
 def main(argv=None):
     """
@@ -70,11 +182,12 @@ parameter variations into the existing file structure.
 
     parser.add_option(
                     "-b",
-                    action="store",
+                    action="append",
                     dest="beta",
                     type="float",
-                    default=0.0,
-                    help="Drift angle beta (Default = 0.0)"
+                    default=None,
+                    help="""Drift angle beta. Can be given multiple times, to
+set up the cases for several drift angles. (Default = 0.0)"""
                     )
 
     parser.add_option(
@@ -94,6 +207,26 @@ v=0 m/s will be neglected. (Default = 10)"""
                     default="0.0",
                     help="Service speed in m/s (Default = 0.0m/s)"
                     )
+    parser.add_option(
+                    "-j", "--jobs",
+                    action="store",
+                    dest="jobs",
+                    type="int",
+                    default=1,
+                    help="Number of cases, that are set up concurrently. "
+                        "(default=1)"
+                    )
+    parser.add_option(
+                    "--link",
+                    action="store",
+                    type="choice",
+                    choices=['hard','reflink'],
+                    dest="linkMode",
+                    default=None,
+                    help="""Share the mesh and other static files of the
+template with the cases as hardlinks (hard) or copy-on-write copies (reflink),
+instead of copying them. (Default: copy)"""
+                    )
     parser.add_option(
                     "-r",
                     action="store",
@@ -124,81 +257,85 @@ on the equations presented in the Fluent (R) handbook."""
     except ValueError:
         exec "v =  array(%s)" %options.u
 
+    if not options.beta:
+        options.beta = [0.0]
+
     # Assemble the current working directory
     workingDir = path.join(getcwd(),options.mesh)
 
-    # Put together the name of the target angle folder
-    driftAngleName = "beta%.2f" %options.beta
-
-    # Assemble the absolute path of the angle folder
-    if not options.subpath:
-        driftAngleDirectory = path.join(workingDir,driftAngleName)
-    else:
-        driftAngleDirectory = path.join(workingDir,options.subpath,driftAngleName)
-
-    # Check if the directory exists, that should store the cases for the current
-    # drift angle.
-    if not path.exists(driftAngleDirectory):
-        makedirs(driftAngleDirectory)
+    # Collect the cases of all drift angles, each in its own angle folder and
+    # numbered by the velocity.
+    tasks = []
+    for betaI in options.beta:
+        # Put together the name of the target angle folder
+        driftAngleName = "beta%.2f" %betaI
+
+        # Assemble the absolute path of the angle folder
+        if not options.subpath:
+            driftAngleDirectory = path.join(workingDir,driftAngleName)
+        else:
+            driftAngleDirectory = path.join(workingDir,options.subpath,driftAngleName)
+
+        # Check if the directory exists, that should store the cases for the
+        # current drift angle.
+        if not path.exists(driftAngleDirectory):
+            makedirs(driftAngleDirectory)
+        else:
+            raise IOError("Directory %s does already exist" %driftAngleDirectory)
+
+        for i,vI in enumerate(v):
+            tasks.append((
+                        path.join(driftAngleDirectory,"v%02d" %(i + 1)),
+                        vI,
+                        betaI,
+                        options.dh,
+                        options.withoutTurbulence,
+                        options.linkMode
+                        ))
+
+    templateName = path.join(getcwd(),options.mesh,options.template)
+    if options.jobs <= 1:
+        initTemplate(templateName)
+        results = imap(setupCase,tasks)
+        pool = None
     else:
-        raise IOError("Directory %s does already exist" %driftAngleDirectory)
-
-
-    template = Case.case(
-                            path.join(getcwd(),options.mesh,options.template),
-                            archive=None,
-                            paraviewLink=False
-                            )
-    template.addToClone("runCluster")
-    template.addToClone("customRegexp")
-
-    print "\nDrift angle beta = %.2f\n" %options.beta
-
-    i = 1
-    for vI in v:
-        print "Cloning case for v = %.3f" %vI
-
-        # Clone the template case and open velocity boundary condition
-        case = template.cloneCase(path.join(driftAngleDirectory,"v%02d" %i))
-        uFile = ParsedParameterFile(path.join(case.name,"0","U"))
-
-        # Rotate the velocity vector around z axis, according to the specified
-        # drift angle.
-        U = Vector(
-                vI*math.cos(math.radians(options.beta)),
-                vI*math.sin(math.radians(options.beta)),
-                0
-                )
-
-        # Update the boundary condition(s) with the respective values, that have
-        # been calculated previously.
-        uFile["internalField"].setUniform(U)
-        for b in ["XMIN","XMAX","YMIN","YMAX","ZMIN", "ZMAX"]:
-
-            patchType = uFile["boundaryField"][b]['type']
-            setPatch = False
-            for inlet in ['value', 'inletValue', 'tangentialVelocity']:
-                try:
-                    uFile["boundaryField"][b][inlet].setUniform(U)
-                    setPatch = True
-                except KeyError:
-                    pass
-
-            if setPatch:
-                print "\tSetting patch: %s type %s" %(b, patchType)
-
-        # Write changes to the boundary conditions
-        uFile.writeFile()
-
-        if not options.withoutTurbulence:
-            print "\tFixing turbulence Dh =", options.dh
-            case.writeTurbulence(options.dh, Utilities.mag(U))
-        
-        # Update counter
-        i += 1
+        pool = Pool(
+                    min(options.jobs,len(tasks)),
+                    initializer=initTemplate,
+                    initargs=(templateName,)
+                    )
+        results = pool.imap(setupCase,tasks)
+
+    # The results are reported in the order of the tasks, as soon as they are
+    # available
+    failed = []
+    for n,(tI,(messages,error)) in enumerate(izip(tasks,results)):
+        print "[%i/%i] Drift angle beta = %.2f, v = %.3f: %s" %(
+                                                            n + 1,
+                                                            len(tasks),
+                                                            tI[2],
+                                                            tI[1],
+                                                            tI[0]
+                                                            )
+        for mI in messages:
+            print mI
+        if error:
+            sys.stderr.write("\tFailed: %s\n" %error)
+            failed.append(tI[0])
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    if failed:
+        sys.stderr.write("\n%i of %i cases failed:\n" %(len(failed),len(tasks)))
+        for fI in failed:
+            sys.stderr.write("\t%s\n" %fI)
+        return 1
 
     print "\nDone!"
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
@@ -21,10 +21,14 @@ points0 = BM.boundingBox(
             (0.5*width,0.5*width,0.5*width)
         )
 
+# Initialise a BlockMesh instance that only need a SolutionDirectory for
+# construction. Each mesh keeps its own vertices and blocks.
+mesh = BM.blockMesh(case)
+
 # After the point definition, the blocks must get genrated from the points.
 # We can pass a point list, cells/nodes+1 in all three directions as well as
-# the respective edge grading to the constructor of a block.
-block0 = BM.block(points0, nodes=[cells, cells, cells], gradings=[1,1,1])
+# the respective edge grading to the mesh, which creates the block.
+block0 = mesh.createBlock(points0, nodes=[cells, cells, cells], gradings=[1,1,1])
 
 # Though it makes no real sense for this example, we can generate patches from
 # the boundary faces of a block, just as known from blockMesh itself. The patch
@@ -32,10 +36,6 @@ block0 = BM.block(points0, nodes=[cells, cells, cells], gradings=[1,1,1])
 # be passed as an optional argument.
 outside = BM.patch("OUTSIDE", [block0.faces[i] for i in range(0,6)])
 
-# Initialise a BlockMesh instance that only need a SolutionDirectory for
-# construction.
-mesh = BM.blockMesh(case)
-
 # All blocks and patches must get added to the mesh
 mesh.addBlocks([block0])
 mesh.addPatches([outside])
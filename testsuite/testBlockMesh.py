@@ -24,20 +24,22 @@ from OF.Mesh import BlockMesh
 
 case = SolutionDirectory("/Users/jens/OpenFOAM/jens-1.6/applications/iMesher/testCase", archive=None, paraviewLink=False)
 
+mesh = BlockMesh.blockMesh(case)
+
 points1 = [(0,0,0),(1,1,1)]
-block1 = BlockMesh.block(points1,nodes=[3,10,20],gradings=[1,1,1])
+block1 = mesh.createBlock(points1,nodes=[3,10,20],gradings=[1,1,1])
 
 points2 = [(1,0,0),(2,1,1)]
-block2 = BlockMesh.block(points2,nodes={0:9},gradings={0:1})
+block2 = mesh.createBlock(points2,nodes={0:9},gradings={0:1})
 
 points3 = [(0,1,0),(1,5,1)]
-block3 = BlockMesh.block(points3,nodes={1:3},gradings={1:3})
+block3 = mesh.createBlock(points3,nodes={1:3},gradings={1:3})
 
 points4 = [(0,1,-3),(1,5,0)]
-block4 = BlockMesh.block(points4,nodes={2:15},gradings={2:0.5})
+block4 = mesh.createBlock(points4,nodes={2:15},gradings={2:0.5})
 
 points5 = [(2,0,0),(5,1,1)]
-block5 = BlockMesh.block(points5,nodes={0:7},gradings={0:1})
+block5 = mesh.createBlock(points5,nodes={0:7},gradings={0:1})
 
 
 block1.adjustGrading(block2,0)
@@ -54,7 +56,6 @@ top = BlockMesh.patch("top",[
                             ],type="wall")
 
 
-mesh = BlockMesh.blockMesh(case)
 mesh.addBlocks([
                 block1,
                 block2,
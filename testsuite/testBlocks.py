@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+#Copyright (C) 2013 Jens Hoepken
+
+#This program is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 2 of the License, or
+#(at your option) any later version.
+
+#This program is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#GNU General Public License for more details.
+
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+
+import unittest
+import shutil
+import tempfile
+from os.path import join
+from StringIO import StringIO
+
+import numpy
+
+from PyFoam.RunDictionary.ParsedBlockMeshDict import ParsedBlockMeshDict
+
+from OF.Mesh import BlockMesh
+
+class KnownValues(unittest.TestCase):
+
+    # Number of nodes, first cell size and edge length
+    edges = (
+            (10, 0.05, 1.0),
+            (10, 0.2, 1.0),
+            (20, 0.01, 2.0),
+            (5, 0.2, 1.0)
+        )
+
+    def setUp(self):
+        self.registry = BlockMesh.meshRegistry(capacity=2)
+        BlockMesh.block.registry = self.registry
+
+    def createBlocks(self):
+        """
+        Creates the blocks of testBlockMesh
+        """
+        return [
+            BlockMesh.block([(0,0,0),(1,1,1)],nodes=[3,10,20],gradings=[1,1,1]),
+            BlockMesh.block([(1,0,0),(2,1,1)],nodes={0:9},gradings={0:1}),
+            BlockMesh.block([(0,1,0),(1,5,1)],nodes={1:3},gradings={1:3}),
+            BlockMesh.block([(0,1,-3),(1,5,0)],nodes={2:15},gradings={2:0.5}),
+            BlockMesh.block([(2,0,0),(5,1,1)],nodes={0:7},gradings={0:1})
+            ]
+
+    def testVertices(self):
+        """
+        Tests that shared vertices are registered once and referenced by all
+        blocks
+        """
+        blocks = self.createBlocks()
+        self.assertEqual(self.registry.storage.pointCount, 24)
+        self.assertEqual(blocks[0].ownVertices[1].id, blocks[1].ownVertices[0].id)
+        self.assertEqual(blocks[4].ownVertices[6], (5.0, 1.0, 1.0))
+        self.assertEqual(list(blocks[4].ownVertices[6]), [5.0, 1.0, 1.0])
+
+        # Vertices constructed directly are registered as well
+        v = BlockMesh.vertex((7, 8, 9))
+        self.assertEqual(v.id, 24)
+        self.assertEqual(blocks[0].checkDuplicateVertices((7, 8, 9)), v.id)
+        self.assertEqual(BlockMesh.vertex((5, 1, 1)).id, blocks[4].ownVertices[6].id)
+        self.assertEqual(self.registry.storage.pointCount, 25)
+
+    def testEdges(self):
+        """
+        Tests that shared edges are registered once
+        """
+        blocks = self.createBlocks()
+        self.assertEqual(len(self.registry.edges), 44)
+        self.assertTrue(blocks[0].ownEdges[5] is blocks[1].ownEdges[4])
+        self.assertEqual(blocks[1].ownEdges[4].l, 1.0)
+
+    def testNeighbours(self):
+        """
+        Tests the neighbours found on construction and by the mesh
+        """
+        blocks = self.createBlocks()
+        neighbours = [
+                    [-1, 1, -1, 2, -1, -1],
+                    [0, 4, -1, -1, -1, -1],
+                    [-1, -1, 0, -1, 3, -1],
+                    [-1, -1, -1, -1, -1, 2],
+                    [1, -1, -1, -1, -1, -1]
+                    ]
+        self.assertEqual([list(bI.neighbours) for bI in blocks], neighbours)
+        self.assertFalse(blocks[0].faces[1].boundaryFace)
+        self.assertTrue(blocks[0].faces[0].boundaryFace)
+
+        mesh = BlockMesh.blockMesh(None, registry=self.registry)
+        mesh.addBlocks(blocks[:2])
+        mesh.build()
+        self.assertEqual(blocks[0].neighbours[3], -1)
+        self.assertEqual(blocks[1].neighbours[1], -1)
+        self.assertEqual(blocks[1].neighbours[0], 0)
+
+    def testChains(self):
+        """
+        Tests the chains of blocks and that they are updated, if a block is
+        added
+        """
+        blocks = self.createBlocks()
+        self.assertEqual(blocks[1].chain(0), [0, 1, 4])
+        self.assertEqual(blocks[0].allNeighbours(0), [1, 4])
+        self.assertEqual(blocks[2].allNeighbours(1), [0])
+        self.assertEqual(blocks[2].allNeighbours(2), [3])
+
+        BlockMesh.block([(-1,0,0),(0,1,1)])
+        self.assertEqual(blocks[4].chain(0), [5, 0, 1, 4])
+
+        # Long chains must not hit the recursion limit
+        for i in range(2000):
+            BlockMesh.block([(5+i,0,0),(6+i,1,1)])
+        self.assertEqual(len(blocks[0].chain(0)), 2004)
+
+    def testCheck(self):
+        """
+        Tests the propagation of nodes and gradings and the handling of
+        conflicts
+        """
+        blocks = self.createBlocks()
+        blocks[0].adjustGrading(blocks[1],0)
+        mesh = BlockMesh.blockMesh(None, registry=self.registry)
+        mesh.addBlocks(blocks)
+        mesh.check()
+        self.assertEqual(
+                    [list(bI.nodes) for bI in blocks],
+                    [
+                    [3, 10, 20],
+                    [9, 10, 20],
+                    [3, 3, 20],
+                    [3, 3, 15],
+                    [7, 10, 20]
+                    ]
+                    )
+        self.assertEqual(blocks[3].gradings[0], blocks[0].gradings[0])
+        self.assertEqual(mesh.conflicts, [])
+
+        blocks[4].nodes[2] = 5
+        mesh.check()
+        self.assertEqual(mesh.conflicts, [('nodes', 2, [0, 4])])
+        self.assertEqual(blocks[4].nodes[2], 20)
+
+        blocks[4].nodes[2] = 5
+        blocks[1].noNodeAdjustment = True
+        self.assertRaises(ValueError, mesh.check)
+
+    def testEquivalenceClasses(self):
+        """
+        Tests the grouping of connected elements
+        """
+        self.assertEqual(
+                    BlockMesh.equivalenceClasses(6, [(4,1), (5,4), (2,3)]),
+                    [0, 1, 2, 2, 1, 1]
+                    )
+
+    def testTolerance(self):
+        """
+        Tests that vertices within the snapping tolerance are merged
+        """
+        registry = BlockMesh.meshRegistry(tolerance=1e-6)
+        block0 = BlockMesh.block([(0,0,0),(1,1,1)], registry=registry)
+        block1 = BlockMesh.block([(1+4e-7,-4e-7,0),(2,1,1)], registry=registry)
+        self.assertEqual(registry.storage.pointCount, 12)
+        self.assertEqual(block0.ownVertices[1].id, block1.ownVertices[0].id)
+        self.assertEqual(block0.neighbours[1], block1.id)
+
+    def testRegistries(self):
+        """
+        Tests that blocks of different registries are independent and that a
+        mesh only accepts blocks of its own registry
+        """
+        blocks = self.createBlocks()
+        registry = BlockMesh.meshRegistry()
+        other = BlockMesh.block([(0,0,0),(1,1,1)], registry=registry)
+        self.assertEqual(other.id, 0)
+        self.assertEqual(other.neighbours[1], -1)
+        self.assertEqual(registry.storage.pointCount, 8)
+        self.assertEqual(len(other.edges), 12)
+
+        mesh = BlockMesh.blockMesh(None, registry=self.registry)
+        mesh.addBlocks(blocks)
+        self.assertTrue(mesh.registry is self.registry)
+        self.assertRaises(ValueError, mesh.addBlocks, [other])
+        self.assertRaises(ValueError, BlockMesh.blockMesh(None).addBlocks, blocks)
+
+    def testSequentialMeshes(self):
+        """
+        Tests that meshes, which are built one after another, do not share
+        their vertices and that blocks created between two calls of addBlocks
+        are linked
+        """
+        for i in range(2):
+            mesh = BlockMesh.blockMesh(None)
+            first = mesh.createBlock([(0,0,0),(1,1,1)])
+            mesh.addBlocks([first])
+            second = mesh.createBlock([(1,0,0),(2,1,1)], nodes={0:4})
+            mesh.addBlocks([second])
+            self.assertEqual(second.neighbours[0], first.id)
+            mesh.build()
+            self.assertEqual(second.neighbours[0], first.id)
+
+            self.assertEqual((first.id, second.id), (0, 1))
+            self.assertEqual(mesh.storage.pointCount, 12)
+            self.assertFalse(mesh.registry is self.registry)
+
+            stream = StringIO()
+            mesh.writeStream(stream)
+            vertices = stream.getvalue().split("\nvertices\n(\n")[1]
+            self.assertEqual(vertices.split(");")[0].count("\n"), 12)
+        self.assertEqual(self.registry.storage.pointCount, 0)
+
+    def testExpansionRatio(self):
+        """
+        Tests that the expansion ratio results in the requested first cell
+        size, for single edges as well as for all at once
+        """
+        blocks = self.createBlocks()
+        ratios = BlockMesh.expansionRatio(*zip(*self.edges))
+        for (n,dX,l),r in zip(self.edges,ratios):
+            self.assertAlmostEqual(blocks[0].ownEdges[0].gradFunction(r,n,dX,l,1), 0)
+            self.assertEqual(BlockMesh.expansionRatio(n,dX,l), r)
+        self.assertAlmostEqual(BlockMesh.expansionRatio(5,0.2,1.0), 1.0)
+
+        # Edges without a grading are NaN, without affecting the others
+        self.assertTrue(numpy.isnan(BlockMesh.expansionRatio(5,2.0,1.0)))
+        ratios = BlockMesh.expansionRatio([5,5,5],[0.2,1.0,0.0],1.0)
+        self.assertAlmostEqual(ratios[0], 1.0)
+        self.assertTrue(numpy.isnan(ratios[1:]).all())
+
+    def testAdjustGrading(self):
+        """
+        Tests that the first cell of an adjusted block matches the cell size
+        of its neighbour
+        """
+        blocks = self.createBlocks()
+        blocks[0].adjustGrading(blocks[1],0)
+        self.assertAlmostEqual(
+            blocks[0].ownEdges[0].lmbd(blocks[0].gradings[0],3), 1.0/9
+            )
+        self.assertEqual(blocks[2].gradings[0], blocks[0].gradings[0])
+        self.assertRaises(KeyError, blocks[0].adjustGrading, blocks[3], 0)
+
+        # A block, whose edges are shorter than the cells of the reference
+        # block, keeps its grading, while the others are adjusted
+        coarse = BlockMesh.block([(-3,0,0),(0,1,1)], nodes=[1,10,20], gradings=[1,1,1])
+        grading = blocks[0].gradings[0]
+        conflicts = BlockMesh.adjustGradings(
+                                        [blocks[0], blocks[4]],
+                                        [coarse, blocks[1]],
+                                        [0, 0]
+                                        )
+        self.assertEqual(conflicts, [('gradings', 0, [blocks[0].id, coarse.id])])
+        self.assertEqual(blocks[0].gradings[0], grading)
+        # The grading of the block is inverted, as it adjoins with its first
+        # face
+        self.assertAlmostEqual(
+            blocks[4].ownEdges[0].lmbd(1.0/blocks[4].gradings[0],7), 1.0/27
+            )
+
+    def testWriteStream(self):
+        """
+        Tests that the written blockMeshDict can be parsed and contains all
+        vertices, blocks and patches, independent of the chunk size
+        """
+        blocks = self.createBlocks()
+        mesh = BlockMesh.blockMesh(None, registry=self.registry)
+        mesh.addBlocks(blocks)
+        mesh.addPatches([
+                    BlockMesh.patch("inlet", [blocks[0].faces[0], blocks[2].faces[0]]),
+                    BlockMesh.patch("top", [blocks[0].faces[5]], type="wall")
+                    ])
+        mesh.check()
+
+        tmp = tempfile.mkdtemp()
+        path = join(tmp, "blockMeshDict")
+        chunkSize = BlockMesh.chunkSize
+        try:
+            BlockMesh.chunkSize = 2
+            with open(path, "w") as f:
+                mesh.writeStream(f)
+            parsed = ParsedBlockMeshDict(path)
+        finally:
+            BlockMesh.chunkSize = chunkSize
+            shutil.rmtree(tmp)
+
+        self.assertEqual(len(parsed["vertices"]), 24)
+        self.assertEqual(list(parsed["vertices"][22]), [5, 0, 1])
+        self.assertEqual(len(parsed["blocks"]), 5*5)
+        self.assertEqual(list(parsed["blocks"][1]), [0, 1, 2, 3, 4, 5, 6, 7])
+        self.assertAlmostEqual(parsed["blocks"][4][2], blocks[0].gradings[2])
+        self.assertEqual(parsed["patches"][:2], ["patch", "inlet"])
+        self.assertEqual(list(parsed["patches"][2][1]), [7, 15, 13, 3])
+        self.assertEqual(parsed["patches"][4], "top")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+#Copyright (C) 2013 Jens Hoepken
+
+#This program is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 2 of the License, or
+#(at your option) any later version.
+
+#This program is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#GNU General Public License for more details.
+
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+
+import errno
+import unittest
+import shutil
+import tempfile
+from os import makedirs,stat
+from os.path import dirname,join
+
+from OF.Basic import Case
+
+class KnownValues(unittest.TestCase):
+
+    # Files of the template case and their content
+    files = {
+            "system/controlDict": "application simpleFoam;\n",
+            "constant/polyMesh/points": "2((0 0 0) (1 1 1))\n",
+            "constant/transportProperties": "nu nu [0 2 -1 0 0 0 0] 1e-06;\n",
+            "0/U": "internalField uniform (1 0 0);\n",
+            "runCluster": "#!/bin/sh\n"
+            }
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.template = join(self.dir, "template")
+        for fI, content in self.files.items():
+            path = join(self.template, fI)
+            try:
+                makedirs(dirname(path))
+            except OSError:
+                pass
+            with open(path, "w") as f:
+                f.write(content)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def clone(self, linkMode):
+        template = Case.case(self.template, archive=None, paraviewLink=False)
+        template.addToClone("runCluster")
+        return template.cloneCase(join(self.dir, "clone"), linkMode=linkMode)
+
+    def isLinked(self, fI):
+        return stat(join(self.template, fI)).st_ino == \
+                stat(join(self.dir, "clone", fI)).st_ino
+
+    def testHardlinks(self):
+        """
+        Tests that only the shared items are hardlinked
+        """
+        clone = self.clone("hard")
+        self.assertTrue(self.isLinked("constant/polyMesh/points"))
+        self.assertTrue(self.isLinked("runCluster"))
+        self.assertFalse(self.isLinked("0/U"))
+        self.assertFalse(self.isLinked("constant/transportProperties"))
+        with open(join(clone.name, "0", "U")) as f:
+            self.assertEqual(f.read(), self.files["0/U"])
+        self.assertEqual(clone.inletPatch, ["XMIN"])
+
+    def testCopy(self):
+        """
+        Tests that everything is copied without a link mode, and that reflinks
+        result in independent files
+        """
+        for linkMode in (None, "reflink"):
+            self.clone(linkMode)
+            for fI in self.files:
+                self.assertFalse(self.isLinked(fI))
+                with open(join(self.dir, "clone", fI)) as f:
+                    self.assertEqual(f.read(), self.files[fI])
+        self.assertRaises(ValueError, self.clone, "soft")
+
+    def testLinkFallback(self):
+        """
+        Tests that files are only copied, if they cannot be linked
+        """
+        src = join(self.template, "runCluster")
+        copies = []
+        calls = []
+        copy2 = Case.shutil.copy2
+        link = Case.os.link
+        call = Case.subprocess.call
+
+        def recordCopy(src, dst):
+            copies.append(dst)
+            copy2(src, dst)
+
+        def failLink(src, dst):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        def recordCall(args, **kwargs):
+            calls.append(args)
+            return len(calls) - 1
+
+        try:
+            Case.shutil.copy2 = recordCopy
+            Case.linkFile(src, join(self.dir, "hard"), "hard")
+            self.assertEqual(copies, [])
+            self.assertEqual(stat(src).st_ino, stat(join(self.dir, "hard")).st_ino)
+
+            # The first reflink succeeds, the second one fails
+            Case.subprocess.call = recordCall
+            Case.linkFile(src, join(self.dir, "reflink0"), "reflink")
+            self.assertEqual(copies, [])
+            Case.linkFile(src, join(self.dir, "reflink1"), "reflink")
+            self.assertEqual(copies, [join(self.dir, "reflink1")])
+            self.assertEqual(calls[1][:2], ["cp", "--reflink=always"])
+
+            Case.os.link = failLink
+            clone = self.clone("hard")
+        finally:
+            Case.shutil.copy2 = copy2
+            Case.os.link = link
+            Case.subprocess.call = call
+
+        self.assertTrue(join(clone.name, "constant", "polyMesh", "points") in copies)
+        self.assertTrue(join(clone.name, "runCluster") in copies)
+        for fI in self.files:
+            self.assertFalse(self.isLinked(fI))
+            with open(join(clone.name, fI)) as f:
+                self.assertEqual(f.read(), self.files[fI])
+
+    def testCoeffs(self):
+        """
+        Tests that the forces are read once, if the time line is accessed
+        before the resistances
+        """
+        with open(join(self.template, "0", "U"), "w") as f:
+            f.write(
+                "internalField uniform (2 0 0);\n"
+                "boundaryField\n{\n    XMIN\n    {\n        type fixedValue;\n"
+                "        value uniform (2 0 0);\n    }\n}\n"
+                )
+        makedirs(join(self.template, "forces", "0"))
+        with open(join(self.template, "forces", "0", "forces.dat"), "w") as f:
+            for tI in range(1, 4):
+                f.write("%i ((%i 0 0) (-1 0 0)) ((0 0 0) (0 0 0))\n" %(tI, -tI))
+
+        case = Case.case(self.template, archive=None, paraviewLink=False)
+        calls = []
+        calculateCoeffs = case.calculateCoeffs
+        case.calculateCoeffs = lambda: calls.append(calculateCoeffs())
+
+        self.assertEqual(list(case.t), [1.0, 2.0, 3.0])
+        self.assertEqual(list(case.resistances['RF']), [1.0, 1.0, 1.0])
+        self.assertEqual(list(case.resistances['RT']), [2.0, 3.0, 4.0])
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+#Copyright (C) 2013 Jens Hoepken
+
+#This program is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 2 of the License, or
+#(at your option) any later version.
+
+#This program is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#GNU General Public License for more details.
+
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+
+import unittest
+import shutil
+import tempfile
+from os import listdir,makedirs,utime
+from os.path import basename,dirname,isdir,join
+
+import numpy
+
+from OF.PostProcessing import DataFile
+
+class KnownValues(unittest.TestCase):
+
+    # Content of a forces.dat, as written by the forces function object
+    forces = (
+            "# Time forces(pressure, viscous) moment(pressure, viscous)\n"
+            "0.1\t((1 2 3) (4 5 6)) ((7 8 9) (10 11 12))\n"
+            "0.2\t((1.5e-01 -2 3) (4 5 6)) ((7 8 9) (10 11 12))\n"
+            "  // restart\n"
+            "0.3\t((1 2 3) (4 5 6)) ((7 8 9) (10 11 -1.2E+1))"
+        )
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = join(self.dir, "forces.dat")
+        self.write(self.forces)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, content, mode="w"):
+        with open(self.path, mode) as f:
+            f.write(content)
+
+    def testColumns(self):
+        """
+        Tests the column access of the parsed forces file
+        """
+        data = DataFile.dataFile(self.path)
+        self.assertEqual(list(data[0]), [0.1, 0.2, 0.3])
+        self.assertEqual(list(data[1]), [1.0, 0.15, 1.0])
+        self.assertEqual(list(data[12]), [12.0, 12.0, -12.0])
+        self.assertEqual(data[:].shape, (3, 13))
+
+    def testRaggedLines(self):
+        """
+        Tests that lines with a varying number of entries are padded
+        """
+        self.write("1 2 3\n\n4 5\nfoo 6 bar 7 8\n")
+        data = DataFile.dataFile(self.path)
+        self.assertEqual(list(data[0]), [1.0, 4.0, 6.0])
+        self.assertTrue(numpy.isnan(data[2][1]))
+
+    def testRefresh(self):
+        """
+        Tests that appended lines are read and that an unterminated line is
+        replaced once it is complete
+        """
+        data = DataFile.dataFile(self.path)
+        self.write("\n1 ((1 2 3) (4 5 6)) ((7 8 9) (10 11 12))\n0.4 ((1 2", "a")
+        self.assertEqual(data.refresh(), 1)
+        self.assertEqual(list(data[0]), [0.1, 0.2, 0.3, 1.0])
+
+        self.write(" 3) (4 5 6)) ((7 8 9) (10 11 12))\n", "a")
+        self.assertEqual(data.refresh(), 1)
+        self.assertEqual(list(data[0]), [0.1, 0.2, 0.3, 1.0, 0.4])
+        self.assertTrue(numpy.array_equal(
+                                        data[:],
+                                        DataFile.dataFile(self.path)[:]
+                                        ))
+
+    def testCache(self):
+        """
+        Tests that the binary cache is reused, extended for appended lines and
+        discarded if the data file has been rewritten
+        """
+        reference = DataFile.dataFile(self.path, cache=True)
+        self.assertTrue(isdir(self.path + DataFile.cacheSuffix))
+
+        data = DataFile.dataFile(self.path, cache=True)
+        self.assertEqual(data._cachedRows, 2)
+        self.assertTrue(numpy.array_equal(reference[:], data[:]))
+
+        self.write("\n0.4 ((1 2 3) (4 5 6)) ((7 8 9) (10 11 12))\n", "a")
+        data.refresh()
+        self.assertEqual(data._cachedRows, 4)
+        data = DataFile.dataFile(self.path, cache=True)
+        self.assertEqual(list(data[0]), [0.1, 0.2, 0.3, 0.4])
+
+        self.write("1 2\n3 4\n")
+        utime(self.path, (1000000000, 1000000000))
+        data = DataFile.dataFile(self.path, cache=True)
+        self.assertEqual(list(data[1]), [2.0, 4.0])
+        # Temporary files of the atomic replacement are not left behind
+        self.assertEqual(
+                    [fI for fI in listdir(self.path + DataFile.cacheSuffix)
+                        if fI.startswith(".") or fI.endswith(".tmp")],
+                    []
+                    )
+
+        # A rewrite of the same size is detected, even if the modification
+        # time is kept
+        self.write("1 2\n3 5\n")
+        utime(self.path, (1000000000, 1000000000))
+        data = DataFile.dataFile(self.path, cache=True)
+        self.assertEqual(list(data[1]), [2.0, 5.0])
+
+    def testColumnMajor(self):
+        """
+        Tests that columns are contiguous and mapped from the cache
+        """
+        self.write("\n", "a")
+        reference = DataFile.dataFile(self.path)
+        data = DataFile.dataFile(self.path, columnMajor=True)
+        self.assertTrue(data[3].flags.c_contiguous)
+        self.assertTrue(numpy.array_equal(reference[:], data[:]))
+
+        DataFile.dataFile(self.path, cache=True, columnMajor=True)
+        data = DataFile.dataFile(self.path, cache=True, columnMajor=True)
+        self.assertTrue(isinstance(data._columns[0], numpy.memmap))
+        self.assertTrue(numpy.array_equal(reference[:], data[:]))
+
+        self.write("0.4 ((1 2 3) (4 5 6)) ((7 8 9) (10 11 12))\n", "a")
+        data.refresh()
+        self.assertEqual(list(data[0]), [0.1, 0.2, 0.3, 0.4])
+        self.assertEqual(data._cachedRows, 4)
+
+    def testWindow(self):
+        """
+        Tests the time windows on a monotonic time line
+        """
+        data = DataFile.dataFile(self.path)
+        self.assertEqual(data.rows(), slice(0, 3))
+        self.assertEqual(data.window(0.5, 1.0), slice(1, 2))
+        self.assertEqual(data.window(0.15, 0.3, absolute=True), slice(1, 2))
+        self.assertEqual(DataFile.element(data.times(), 0.25, True), 2)
+        self.assertEqual(DataFile.element(data.times(), 1.0, True), 3)
+
+    def testRestart(self):
+        """
+        Tests that times, which have been written again after a restart,
+        supersede the earlier ones
+        """
+        self.write("0.1 1\n0.2 2\n0.3 3\n0.2 4\n0.3 5\n0.4 6\n")
+        data = DataFile.dataFile(self.path)
+        self.assertEqual(list(data.rows()), [0, 3, 4, 5])
+        self.assertEqual(list(data.times()), [0.1, 0.2, 0.3, 0.4])
+        self.assertEqual(list(data[1][data.window(0.2, 0.4, True)]), [4.0, 5.0])
+
+    def testSegments(self):
+        """
+        Tests that the segments of a restarted case are merged and the
+        overlapping times are discarded
+        """
+        for startTime, content in (
+                                ("0", "0.1 1\n0.2 2\n0.3 3\n"),
+                                ("0.2", "0.25 4\n0.3 5\n"),
+                                ("1e-1", "0.15 6\n0.2 7\n")
+                                ):
+            makedirs(join(self.dir, "forces", startTime))
+            with open(join(self.dir, "forces", startTime, "forces.dat"), "w") as f:
+                f.write(content)
+
+        paths = DataFile.segments(join(self.dir, "forces"), "forces.dat")
+        self.assertEqual(
+                    [basename(dirname(pI)) for pI in paths],
+                    ["0", "1e-1", "0.2"]
+                    )
+
+        for columnMajor in (False, True):
+            DataFile.multiDataFile(paths, cache=True, columnMajor=columnMajor)
+            data = DataFile.multiDataFile(paths, cache=True, columnMajor=columnMajor)
+            self.assertEqual(data._cachedRows, 5)
+            self.assertEqual(list(data[0]), [0.1, 0.15, 0.2, 0.25, 0.3])
+            self.assertEqual(list(data[1]), [1.0, 6.0, 7.0, 4.0, 5.0])
+
+    def testSmallBlocks(self):
+        """
+        Tests that the result does not depend on the block size
+        """
+        reference = DataFile.dataFile(self.path)[:]
+        blockSize = DataFile.blockSize
+        try:
+            DataFile.blockSize = 7
+            data = DataFile.dataFile(self.path)
+        finally:
+            DataFile.blockSize = blockSize
+        self.assertTrue(numpy.array_equal(reference, data[:]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+#Copyright (C) 2013 Jens Hoepken
+
+#This program is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 2 of the License, or
+#(at your option) any later version.
+
+#This program is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#GNU General Public License for more details.
+
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+
+import unittest
+import shutil
+import tempfile
+from os.path import join
+
+from OF.Basic import FieldFile
+
+class KnownValues(unittest.TestCase):
+
+    # Velocity field with precalculated values in the internalField
+    field = (
+            "FoamFile\n{\n    format      ascii;\n    object      U;\n}\n"
+            "// * * * * * //\n"
+            "dimensions      [0 1 -1 0 0 0 0];\n\n"
+            "internalField   nonuniform List<vector> \n4\n(\n"
+            "(1 0 0)\n(2 0 0)\n(3 0 0)\n(4 0 0)\n)\n;\n\n"
+            "boundaryField\n{\n"
+            "    /* walls */\n"
+            "    hull\n    {\n        type fixedValue;\n"
+            "        value uniform (0 0 0);\n    }\n"
+            "    XMIN\n    {\n        type fixedValue;\n"
+            "        value nonuniform List<scalar> 2(5 6);\n"
+            "        inletValue uniform (1.5 0 -2e-1);\n    }\n"
+            "    #includeEtc \"caseDicts/setConstraintTypes\"\n"
+            "}\n"
+        )
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = join(self.dir, "U")
+        with open(self.path, "w") as f:
+            f.write(self.field)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def scan(self):
+        with open(self.path, "rb") as f:
+            return list(FieldFile.entries(f))
+
+    def testEntries(self):
+        """
+        Tests the scopes, keywords and values of all entries
+        """
+        entries = self.scan()
+        self.assertEqual(
+                [(sI, kI, vI) for sI, kI, start, end, vI in entries],
+                [
+                ((b"FoamFile",), b"format", b"ascii"),
+                ((b"FoamFile",), b"object", b"U"),
+                ((), b"dimensions", b"[0 1 -1 0 0 0 0]"),
+                ((), b"internalField", b"nonuniform List<vector> 4 (...)"),
+                ((b"boundaryField", b"hull"), b"type", b"fixedValue"),
+                ((b"boundaryField", b"hull"), b"value", b"uniform ( 0 0 0 )"),
+                ((b"boundaryField", b"XMIN"), b"type", b"fixedValue"),
+                ((b"boundaryField", b"XMIN"), b"value",
+                                            b"nonuniform List<scalar> 2 (...)"),
+                ((b"boundaryField", b"XMIN"), b"inletValue",
+                                            b"uniform ( 1.5 0 -2e-1 )"),
+                ((b"boundaryField",), b"#includeEtc",
+                                            b"\"caseDicts/setConstraintTypes\""),
+                ]
+            )
+
+        # The positions span the value up to the terminating semicolon
+        start, end = entries[3][2:4]
+        self.assertTrue(self.field[start:end].startswith("nonuniform"))
+        self.assertEqual(self.field[start:end].rstrip()[-1], ")")
+        self.assertEqual(self.field[end], ";")
+
+    def testSmallChunks(self):
+        """
+        Tests that the result does not depend on the chunk size
+        """
+        reference = self.scan()
+        chunkSize = FieldFile.chunkSize
+        try:
+            FieldFile.chunkSize = 3
+            self.assertEqual(self.scan(), reference)
+        finally:
+            FieldFile.chunkSize = chunkSize
+
+    def testPatchEntries(self):
+        """
+        Tests the lookup of patch entries
+        """
+        entries = FieldFile.patchEntries(
+                                    self.path,
+                                    ["XMIN", "outlet"],
+                                    ("value", "inletValue")
+                                    )
+        self.assertEqual(entries["outlet"], {})
+        self.assertEqual(entries["XMIN"]["inletValue"], b"uniform ( 1.5 0 -2e-1 )")
+
+    def testPatchEntriesStop(self):
+        """
+        Tests that the scan stops at the end of a patch, that lacks some of
+        the entries, instead of reading the rest of the file
+        """
+        size = 10000
+        with open(self.path, "w") as f:
+            f.write(
+                "boundaryField\n{\n"
+                "    XMIN\n    {\n        type fixedValue;\n"
+                "        value uniform (1 0 0);\n    }\n"
+                "}\n"
+                "internalField   nonuniform List<vector> \n%i\n(\n" %size
+                )
+            f.write("(1 0 0)\n"*size)
+            f.write(")\n;\n")
+
+        chunkSize = FieldFile.chunkSize
+        try:
+            FieldFile.chunkSize = 64
+            with open(self.path, "rb") as f:
+                entries = FieldFile.readPatchEntries(
+                                                f,
+                                                ["XMIN"],
+                                                ("value", "inletValue")
+                                                )
+                self.assertTrue(f.tell() <= 2*FieldFile.chunkSize)
+        finally:
+            FieldFile.chunkSize = chunkSize
+        self.assertEqual(entries["XMIN"], {"value": b"uniform ( 1 0 0 )"})
+
+    def testFieldTemplate(self):
+        """
+        Tests that values are spliced into the text of a template
+        """
+        template = FieldFile.fieldTemplate(self.path)
+        self.assertEqual(template.find(("boundaryField", "XMAX"), "value"), None)
+
+        start, end, value = template.find(("boundaryField", "hull"), "value")
+        self.assertEqual(value, b"uniform ( 0 0 0 )")
+        text = template.render([(start, end, b"uniform (1 2 3)")])
+        self.assertEqual(
+                    text,
+                    self.field.replace("uniform (0 0 0)", "uniform (1 2 3)").encode()
+                    )
+
+        template.write(self.path, [(end + 1, end + 1, b" // fixed")])
+        with open(self.path) as f:
+            self.assertTrue("uniform (0 0 0); // fixed" in f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
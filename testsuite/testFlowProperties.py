@@ -17,6 +17,7 @@
 
 
 import unittest
+import numpy
 from OF import Constants
 from OF.Basic import FlowProperties
 
@@ -70,7 +71,32 @@ class KnownValues(unittest.TestCase):
         for vel,Reynolds in self.vRe:
             result = FlowProperties.Re(Re=Reynolds,L=1.0,nu=Constants.water['nu'])
             self.assertEqual(vel, result)
-            
+
+    def testArrays(self):
+        """
+        Tests that velocities and reference lengths are broadcast
+        """
+        vel = numpy.array([vI for vI,ReI in self.vRe])
+        L = numpy.array([1.0, 2.0])
+        result = FlowProperties.Re(u=vel[:,None],L=L[None,:])
+        self.assertEqual(result.shape, (3,2))
+        self.assertTrue(numpy.allclose(result[:,0], [ReI for vI,ReI in self.vRe]))
+        self.assertTrue(numpy.allclose(result[:,1], 2*result[:,0]))
+
+        Froude = numpy.array([FrI for vI,FrI in self.vFr])
+        self.assertTrue(numpy.allclose(FlowProperties.Fr(Fr=Froude,L=1.0), vel))
+
+    def testUFrRe(self):
+        """
+        Tests the conversion of each velocity description into all three
+        """
+        vel = numpy.array([vI for vI,ReI in self.vRe])
+        reference = FlowProperties.uFrRe(u=vel,L=1.0)
+        for key,index in (('Fr',1),('Re',2)):
+            kwargs = {key: reference[index], 'L': 1.0, 'u': None}
+            for rI,resultI in zip(reference,FlowProperties.uFrRe(**kwargs)):
+                self.assertTrue(numpy.allclose(rI,resultI))
+        self.assertRaises(ValueError, FlowProperties.uFrRe, u=1.0, Re=1e6, L=1.0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+#Copyright (C) 2013 Jens Hoepken
+
+#This program is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 2 of the License, or
+#(at your option) any later version.
+
+#This program is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#GNU General Public License for more details.
+
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+
+import unittest
+import shutil
+import tempfile
+from os import makedirs
+from os.path import join
+
+from numpy import isnan
+
+from OF.Basic import Case
+from OF.PostProcessing import ResultsIndex
+
+class KnownValues(unittest.TestCase):
+
+    # Velocity field with the inlet velocity
+    velocity = (
+            "FoamFile\n{\n    format ascii;\n    class volVectorField;\n"
+            "    object U;\n}\n"
+            "internalField uniform (2 0 0);\n"
+            "boundaryField\n{\n"
+            "    XMIN\n    {\n        type fixedValue;\n"
+            "        value uniform (2 0 0);\n    }\n"
+            "}\n"
+        )
+
+    kwargs = {
+            'archive': None,
+            'paraviewLink': False,
+            'L': 1.0,
+            'A': 2.0
+            }
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.names = [join(self.dir, "v01"), join(self.dir, "v02")]
+        for nI in self.names:
+            for dI in ("0", "constant", "system"):
+                makedirs(join(nI, dI))
+            with open(join(nI, "0", "U"), "w") as f:
+                f.write(self.velocity)
+            with open(join(nI, "system", "controlDict"), "w") as f:
+                f.write("application simpleFoam;\n")
+
+        # Only the first case has forces
+        makedirs(join(self.names[0], "forces", "0"))
+        self.writeForces([(1, -1.0), (2, -2.0), (3, -4.0), (4, -6.0)])
+
+        self.path = join(self.dir, "index.sqlite")
+        self.loaded = []
+        self.loadCases = Case.loadCases
+        Case.loadCases = self.recordLoadCases
+
+    def tearDown(self):
+        Case.loadCases = self.loadCases
+        shutil.rmtree(self.dir)
+
+    def recordLoadCases(self, names, **kwargs):
+        self.loaded += names
+        return self.loadCases(names, **kwargs)
+
+    def writeForces(self, forces, mode="w"):
+        with open(join(self.names[0], "forces", "0", "forces.dat"), mode) as f:
+            for tI, fI in forces:
+                f.write("%g ((%g 0 0) (%g 0 0)) ((0 0 0) (0 0 0))\n" %(tI, fI, fI))
+
+    def statistics(self, start=0.5, end=1.0, absolute=False):
+        index = ResultsIndex.resultsIndex(self.path)
+        try:
+            return index.statistics(
+                                self.names,
+                                start=start,
+                                end=end,
+                                absolute=absolute,
+                                **self.kwargs
+                                )
+        finally:
+            index.close()
+
+    def testStatistics(self):
+        """
+        Tests the statistics and that unchanged cases are not loaded again,
+        unlike cases, that have failed to load
+        """
+        result = self.statistics()
+        self.assertEqual(self.loaded, self.names)
+        self.assertEqual(result[0].uInf, 2.0)
+        self.assertEqual(result[0].mean['RF'], 3.0)
+        self.assertEqual(result[0].mean['RT'], 6.0)
+        self.assertEqual(result[0].std['RF'], 1.0)
+        self.assertEqual(result[0].error, None)
+        self.assertEqual(
+                result[1].error,
+                "ValueError: No forces found for the case %s in %s or %s or %s" %(
+                    self.names[1],
+                    join(self.names[1], "forces"),
+                    join(self.names[1], "forcesFS"),
+                    join(self.names[1], "resistance")
+                    )
+                )
+
+        self.loaded = []
+        cached = self.statistics()
+        self.assertEqual(self.loaded, [self.names[1]])
+        self.assertEqual(cached[0].mean, result[0].mean)
+        self.assertEqual(cached[0].Fr, result[0].Fr)
+        self.assertEqual(cached[1].error, result[1].error)
+
+        # Another window requires to load the case
+        self.loaded = []
+        self.statistics(start=0.0)
+        self.assertEqual(self.loaded, self.names)
+
+    def testEmptyWindow(self):
+        """
+        Tests that the statistics of a window without samples are NaN, also
+        when they are taken from the index
+        """
+        result = self.statistics(start=10.0, end=20.0, absolute=True)
+        self.loaded = []
+        cached = self.statistics(start=10.0, end=20.0, absolute=True)
+        self.assertEqual(self.loaded, [self.names[1]])
+        for rI in (result[0], cached[0]):
+            self.assertTrue(isnan(rI.mean['RF']))
+            self.assertTrue(isnan(rI.std['RT']))
+        self.assertEqual(cached[0].uInf, 2.0)
+
+    def testUpdate(self):
+        """
+        Tests that a case is loaded again, if its forces have changed
+        """
+        self.statistics()
+        self.loaded = []
+        self.writeForces([(5, -8.0), (6, -10.0)], "a")
+        result = self.statistics()
+        self.assertEqual(self.loaded, self.names)
+        self.assertEqual(result[0].mean['RF'], 6.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,8 +17,10 @@
 
 
 import unittest
+import numpy
 from OF import Constants
 from OF.Basic import FlowProperties
+from OF.NavalHydro import SkinFriction
 
 class KnownValues(unittest.TestCase):
 
@@ -70,7 +72,55 @@ class KnownValues(unittest.TestCase):
         for vel,Reynolds in self.vRe:
             result = FlowProperties.Re(Re=Reynolds,L=1.0,nu=Constants.water['nu'])
             self.assertEqual(vel, result)
-            
+
+    def testFrictionLineArrays(self):
+        """
+        Tests that the friction lines are evaluated element wise for arrays
+        """
+        Re = numpy.array([ReI for vI,ReI in self.vRe])
+        for line in (SkinFriction.ittc57, SkinFriction.huges):
+            result = line(Re=Re)
+            self.assertEqual(result.shape, Re.shape)
+            for ReI,CfI in zip(Re,result):
+                self.assertAlmostEqual(line(Re=ReI), CfI)
+            self.assertTrue(numpy.allclose(
+                                    line(u=Re/self.vRe[0][1],L=1.0),
+                                    result
+                                    ))
+
+    def testSchoenherr(self):
+        """
+        Tests that the Schoenherr line satisfies its implicit definition, for
+        the direct solution as well as the interpolated one
+        """
+        Re = numpy.logspace(2, 12, 101)
+        Cf = SkinFriction.schoenherr(Re=Re)
+        self.assertTrue(numpy.allclose(0.242/numpy.sqrt(Cf), numpy.log10(Cf*Re)))
+        self.assertAlmostEqual(SkinFriction.schoenherr(Re=1e6), Cf[40])
+        self.assertTrue(numpy.allclose(
+                                SkinFriction.schoenherr(Re=Re, interpolate=True),
+                                Cf,
+                                rtol=1e-7
+                                ))
+        self.assertAlmostEqual(
+                            SkinFriction.schoenherr(Re=1e12, interpolate=True),
+                            Cf[-1]
+                            )
+
+    def testSchoenherrSmallRe(self):
+        """
+        Tests that the Schoenherr line is solved for small Reynoldsnumbers and
+        is 0 for Reynoldsnumbers, where it is not defined
+        """
+        Re = numpy.array([-1.0, 0.0, 0.5, 1.0, 1.5, 5.0, 20.0])
+        for interpolate in (False, True):
+            Cf = SkinFriction.schoenherr(Re=Re, interpolate=interpolate)
+            self.assertEqual(list(Cf[:4]), [0.0]*4)
+            self.assertTrue(numpy.allclose(
+                                0.242/numpy.sqrt(Cf[4:]),
+                                numpy.log10(Cf[4:]*Re[4:])
+                                ))
+            self.assertEqual(SkinFriction.schoenherr(Re=1.0, interpolate=interpolate), 0.0)
 
 
 if __name__ == "__main__":
@@ -16,9 +16,30 @@
 #Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
 
 
+import gzip
 import unittest
+import shutil
+import tempfile
+from os import listdir,mkdir
+from os.path import join
+
+from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
+
 from OF import Constants
-from OF.Basic import Turbulence
+from OF.Basic import FieldFile, Turbulence
+
+class dummyCase():
+    """
+    Provides the attributes of :class:`~OF.Basic.Case.case`, that are used by
+    :class:`~OF.Basic.Turbulence.initFieldFoam`
+    """
+
+    first = "0"
+    inletPatch = ["inlet", "side"]
+    turbulenceModel = "kOmegaSST"
+
+    def __init__(self, name):
+        self.name = name
 
 class KnownValues(unittest.TestCase):
 
@@ -42,6 +63,95 @@ class KnownValues(unittest.TestCase):
             self.assertAlmostEqual(output['epsilon'], result['epsilon'])
             self.assertAlmostEqual(output['omega'], result['omega'])
 
+    def testWrite(self):
+        """
+        Tests that parsing, patching and rendering the field files from a
+        template update the same entries
+        """
+        field = (
+                "FoamFile\n{\n    format ascii;\n    class volScalarField;\n"
+                "    object %s;\n}\n"
+                "dimensions [0 2 -2 0 0 0 0];\n"
+                "internalField nonuniform List<scalar> 3(1 2 3);\n"
+                "boundaryField\n{\n"
+                "    inlet\n    {\n        type fixedValue;\n"
+                "        value uniform 0;\n    }\n"
+                "    side\n    {\n        type fixedValue;\n    }\n"
+                "    outlet\n    {\n        type zeroGradient;\n    }\n"
+                "    hull\n    {\n        type kqRWallFunction;\n"
+                "        value uniform 0;\n    }\n"
+                "}\n"
+            )
+
+        results = []
+        for streaming, template in ((False, False), (True, False), (None, True)):
+            tmp = tempfile.mkdtemp()
+            try:
+                mkdir(join(tmp, "0"))
+                for fieldI in ("k", "omega"):
+                    with open(join(tmp, "0", fieldI), "w") as f:
+                        f.write(field %fieldI)
+                templates = {}
+                if template:
+                    templates["omega"] = FieldFile.fieldTemplate(join(tmp, "0", "omega"))
+                init = Turbulence.initFieldFoam(dummyCase(tmp), 1.0, 0.005, I=0.05)
+                init.write(streaming=streaming, templates=templates)
+                results.append(ParsedParameterFile(join(tmp, "0", "omega")))
+            finally:
+                shutil.rmtree(tmp)
+
+        for resultI in results:
+            self.assertAlmostEqual(resultI['internalField'].val, init['omega'], 5)
+            for patchI in ("inlet", "side", "hull"):
+                self.assertEqual(
+                            resultI['boundaryField'][patchI]['value'],
+                            resultI['internalField']
+                            )
+            self.assertFalse('value' in resultI['boundaryField']['outlet'])
+
+    def testCompressedField(self):
+        """
+        Tests that compressed field files are written compressed again and
+        that patches without a type are skipped
+        """
+        field = (
+                "FoamFile\n{\n    format ascii;\n    class volScalarField;\n"
+                "    object %s;\n}\n"
+                "dimensions [0 2 -2 0 0 0 0];\n"
+                "internalField uniform 0;\n"
+                "boundaryField\n{\n"
+                "    inlet\n    {\n        type fixedValue;\n"
+                "        value uniform 0;\n    }\n"
+                "    side\n    {\n        $inlet;\n    }\n"
+                "    top $inlet;\n"
+                "    hull\n    {\n        type kqRWallFunction;\n"
+                "        value uniform 0;\n    }\n"
+                "    #includeEtc \"caseDicts/setConstraintTypes\"\n"
+                "}\n"
+            )
+
+        tmp = tempfile.mkdtemp()
+        try:
+            mkdir(join(tmp, "0"))
+            for fieldI in ("k", "omega"):
+                with gzip.open(join(tmp, "0", fieldI + ".gz"), "wb") as f:
+                    f.write(field %fieldI)
+            init = Turbulence.initFieldFoam(dummyCase(tmp), 1.0, 0.005, I=0.05)
+            init.write()
+
+            self.assertEqual(sorted(listdir(join(tmp, "0"))), ["k.gz", "omega.gz"])
+            with gzip.open(join(tmp, "0", "omega.gz"), "rb") as f:
+                self.assertTrue("top $inlet;" in f.read())
+            result = ParsedParameterFile(join(tmp, "0", "omega"))
+            self.assertTrue(result.zipped)
+            self.assertAlmostEqual(result['internalField'].val, init['omega'], 5)
+            self.assertEqual(
+                        result['boundaryField']['hull']['value'],
+                        result['internalField']
+                        )
+        finally:
+            shutil.rmtree(tmp)
+
 
 if __name__ == "__main__":
     unittest.main()